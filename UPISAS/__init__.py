@@ -1,5 +1,6 @@
 import jsonschema
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 
 from UPISAS.exceptions import ServerNotReachable, IncompleteJSONSchema
@@ -22,10 +23,21 @@ def show_progress(line, progress):
         progress.update(pull_image_tasks[id], completed=line['progressDetail']['current'])
 
 
-def get_response_for_get_request(url):
+def create_session(pool_connections=4, pool_maxsize=8, pool_block=False):
+    """ Create a keep-alive HTTP session backed by a connection pool.
+    pool_connections is the number of hosts kept in the pool, pool_maxsize the number of connections kept per host.
+    With pool_block set, callers wait for a free connection instead of opening one beyond pool_maxsize."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_response_for_get_request(url, session=None):
     try:
         logging.info("GET request to " + str(url))
-        response = requests.get(url)
+        response = (session or requests).get(url)
         return response
     except requests.exceptions.ConnectionError as e:
         logging.error(e)
@@ -33,14 +45,51 @@ def get_response_for_get_request(url):
         raise ServerNotReachable
 
 
-def validate_schema(json_instance, json_schema):
+def get_response_for_put_request(url, params=None, session=None):
     try:
-        incomplete_warning_message = "No complete JSON Schema provided for validation"
+        logging.info("PUT request to " + str(url))
+        response = (session or requests).put(url, params=params)
+        return response
+    except requests.exceptions.ConnectionError as e:
+        logging.error(e)
+        logging.error("Please check that the server is reachable and retry.")
+        raise ServerNotReachable
+
+
+class CompiledSchema:
+    """ A JSON Schema prepared once for repeated validation: its validator and the set of expected keys.
+    keys is None when the schema is incomplete (no type or properties)."""
+    __slots__ = ("schema", "keys", "validator", "checked")
+
+    def __init__(self, json_schema):
+        self.schema = json_schema
+        self.keys = None
+        self.validator = None
+        self.checked = False
         if json_schema and "type" in json_schema and "properties" in json_schema:
-            json_instance_keys = sorted(json_instance.keys())
-            json_schema_keys = sorted(json_schema["properties"].keys())
-            if json_instance_keys == json_schema_keys:
-                jsonschema.validate(json_instance, json_schema)
+            self.keys = frozenset(json_schema["properties"].keys())
+            self.validator = jsonschema.validators.validator_for(json_schema)(json_schema)
+
+
+def compile_schema(json_schema, compiled=None):
+    """ Return `compiled` if it was built from this very schema object, otherwise compile the schema again."""
+    if compiled is not None and compiled.schema is json_schema:
+        return compiled
+    return CompiledSchema(json_schema)
+
+
+def validate_schema(json_instance, json_schema, compiled=None):
+    compiled = compile_schema(json_schema, compiled)
+    try:
+        incomplete_warning_message = "No complete JSON Schema provided for validation"
+        if compiled.keys is not None:
+            if json_instance.keys() == compiled.keys:
+                if not compiled.checked:
+                    compiled.validator.check_schema(json_schema)
+                    compiled.checked = True
+                error = jsonschema.exceptions.best_match(compiled.validator.iter_errors(json_instance))
+                if error is not None:
+                    raise error
                 logging.info("JSON object validated by JSON Schema")
             else:
                 logging.error(incomplete_warning_message + " Keys misaligned")
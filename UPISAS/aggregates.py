@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from collections import deque
+import math
+
+
+class Aggregate(ABC):
+    """
+    A statistic over the values monitored for one key, updated in O(1) by Strategy.monitor().
+    """
+
+    @abstractmethod
+    def update(self, value):
+        pass
+
+    @property
+    @abstractmethod
+    def value(self):
+        pass
+
+
+class RunningMean(Aggregate):
+    '''Mean (and sum and count) of every value seen so far'''
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+
+    def update(self, value):
+        self.count += 1
+        self.sum += value
+
+    @property
+    def value(self):
+        return self.sum / self.count if self.count else 0
+
+
+class WindowedMean(Aggregate):
+    '''Mean of the last `window` values, kept as a running sum over a sliding window'''
+
+    def __init__(self, window):
+        self.window = deque(maxlen=window)
+        self.sum = 0.0
+
+    def update(self, value):
+        if len(self.window) == self.window.maxlen:
+            self.sum -= self.window[0]
+        self.window.append(value)
+        self.sum += value
+
+    @property
+    def value(self):
+        return self.sum / len(self.window) if self.window else 0
+
+
+class EWMA(Aggregate):
+    '''Exponentially weighted moving average, with smoothing factor `alpha`'''
+
+    def __init__(self, alpha):
+        self.alpha = alpha
+        self._value = None
+
+    def update(self, value):
+        self._value = value if self._value is None else self.alpha * value + (1 - self.alpha) * self._value
+
+    @property
+    def value(self):
+        return self._value if self._value is not None else 0
+
+
+class StreamingQuantile(Aggregate):
+    '''Estimate of the `quantile` (e.g. 0.95) of every value seen so far, in constant memory (P-square algorithm)'''
+
+    def __init__(self, quantile):
+        self.quantile = quantile
+        self._heights = []
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * quantile, 1 + 4 * quantile, 3 + 2 * quantile, 5]
+        self._increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def update(self, value):
+        heights = self._heights
+        if len(heights) < 5:
+            heights.append(value)
+            heights.sort()
+            return
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = next(i for i in range(4) if heights[i] <= value < heights[i + 1])
+        for i in range(cell + 1, 5):
+            self._positions[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+        for i in range(1, 4):
+            delta = self._desired[i] - self._positions[i]
+            if (delta >= 1 and self._positions[i + 1] - self._positions[i] > 1) or \
+                    (delta <= -1 and self._positions[i - 1] - self._positions[i] < -1):
+                step = int(math.copysign(1, delta))
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = self._linear(i, step)
+                heights[i] = height
+                self._positions[i] += step
+
+    def _parabolic(self, i, step):
+        n, q = self._positions, self._heights
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def _linear(self, i, step):
+        n, q = self._positions, self._heights
+        return q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+
+    @property
+    def value(self):
+        heights = self._heights
+        if not heights:
+            return 0
+        if len(heights) < 5:
+            return heights[min(len(heights) - 1, int(round(self.quantile * (len(heights) - 1))))]
+        return heights[2]
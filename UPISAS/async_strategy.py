@@ -0,0 +1,119 @@
+from functools import partial
+import asyncio
+import pprint
+import logging
+
+from UPISAS.strategy import Strategy
+
+pp = pprint.PrettyPrinter(indent=4)
+
+
+class AsyncStrategy(Strategy):
+    '''
+    Counterpart of Strategy whose HTTP-facing methods are coroutines.
+    Requests run in the event loop's executor on the exemplar's pooled session, so concurrent calls reuse
+    keep-alive connections. analyze() and plan() stay synchronous, as in Strategy.
+    '''
+
+    async def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=False):
+        if with_validation:
+            if(not self.knowledge.monitor_schema): await self.get_monitor_schema()
+        with self.instrumentation.timer("monitor"):
+            fresh_data = await self._perform_get_request(endpoint_suffix)
+            if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
+            self._store_monitored_data(fresh_data, with_validation)
+        return True
+
+    async def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True):
+        if(not adaptation): adaptation = self.knowledge.plan_data
+        with self.instrumentation.timer("execute"):
+            if with_validation:
+                if(not self.knowledge.execute_schema): await self.get_execute_schema()
+                self._validate(adaptation, "execute_schema")
+            await self._run_blocking(Strategy._perform_put_request, self, endpoint_suffix, adaptation)
+        if self.knowledge_log: self.knowledge_log.append("execute", adaptation)
+        return True
+
+    async def get_adaptation_options(self, endpoint_suffix: "API Endpoint" = "adaptation_options", with_validation=True):
+        self.knowledge.adaptation_options = await self._perform_get_request(endpoint_suffix)
+        if with_validation:
+            if(not self.knowledge.adaptation_options_schema): await self.get_adaptation_options_schema()
+            self._validate(self.knowledge.adaptation_options, "adaptation_options_schema")
+        logging.info("adaptation_options set to: ")
+        pp.pprint(self.knowledge.adaptation_options)
+
+    async def get_monitor_schema(self, endpoint_suffix="monitor_schema"):
+        self.knowledge.monitor_schema = await self._perform_get_request(endpoint_suffix)
+        logging.info("monitor_schema set to: ")
+        pp.pprint(self.knowledge.monitor_schema)
+
+    async def get_execute_schema(self, endpoint_suffix="execute_schema"):
+        self.knowledge.execute_schema = await self._perform_get_request(endpoint_suffix)
+        logging.info("execute_schema set to: ")
+        pp.pprint(self.knowledge.execute_schema)
+
+    async def get_adaptation_options_schema(self, endpoint_suffix: "API Endpoint" = "adaptation_options_schema"):
+        self.knowledge.adaptation_options_schema = await self._perform_get_request(endpoint_suffix)
+        logging.info("adaptation_options_schema set to: ")
+        pp.pprint(self.knowledge.adaptation_options_schema)
+
+    async def initialize(self, with_validation=True):
+        '''Fetches the three schemas and the adaptation options concurrently, in a single round trip'''
+        monitor_schema, execute_schema, adaptation_options_schema, adaptation_options = await asyncio.gather(
+            self._perform_get_request("monitor_schema"),
+            self._perform_get_request("execute_schema"),
+            self._perform_get_request("adaptation_options_schema"),
+            self._perform_get_request("adaptation_options"))
+        self.knowledge.monitor_schema = monitor_schema
+        self.knowledge.execute_schema = execute_schema
+        self.knowledge.adaptation_options_schema = adaptation_options_schema
+        self.knowledge.adaptation_options = adaptation_options
+        if with_validation:
+            self._validate(adaptation_options, "adaptation_options_schema")
+        logging.info("schemas and adaptation_options fetched")
+        return True
+
+    async def ping(self):
+        ping_res = await self._perform_get_request(self.exemplar.base_endpoint)
+        logging.info(f"ping result: {ping_res}")
+
+    async def _perform_get_request(self, endpoint_suffix: "API Endpoint"):
+        return await self._run_blocking(Strategy._perform_get_request, self, endpoint_suffix)
+
+    async def _run_blocking(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(function, *args))
+
+
+async def run_mape_k(strategy, period=1.0, iterations=None, stop_condition=None, initialize=True):
+    '''
+    Runs the MAPE-K loop of an AsyncStrategy every `period` seconds, until `iterations` are done
+    or `stop_condition(strategy)` returns True. Returns the number of iterations performed.
+    '''
+    loop = asyncio.get_running_loop()
+    if initialize:
+        await strategy.initialize()
+    iteration = 0
+    deadline = loop.time()
+    while iterations is None or iteration < iterations:
+        await strategy.monitor()
+        with strategy.instrumentation.timer("analyze"):
+            analyzed = strategy.analyze()
+        if analyzed:
+            strategy.log_knowledge("analysis")
+            with strategy.instrumentation.timer("plan"):
+                planned = strategy.plan()
+            if planned:
+                strategy.log_knowledge("plan")
+                if strategy.knowledge.plan_data:
+                    await strategy.execute()
+        iteration += 1
+        if stop_condition and stop_condition(strategy):
+            break
+        deadline += period
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
+    return iteration
+
+
+async def run_mape_k_many(strategies, **kwargs):
+    '''Drives the MAPE-K loops of several AsyncStrategy instances, e.g. one per exemplar, on one event loop'''
+    return await asyncio.gather(*(run_mape_k(strategy, **kwargs) for strategy in strategies))
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, asdict, fields, replace
+import json
+import os
+
+CPU_PERIOD = 100000  # Microseconds, the default CFS period of docker
+
+
+def parse_cpuset(cpuset):
+    '''Cores of a docker cpuset string, e.g. {0, 1, 2, 5} for "0-2,5"'''
+    cores = set()
+    for part in str(cpuset).split(","):
+        first, _, last = part.strip().partition("-")
+        cores.update(range(int(first), int(last or first) + 1))
+    return cores
+
+
+def format_cpuset(cores):
+    '''Docker cpuset string of the given cores, e.g. "0-2,5" for {0, 1, 2, 5}'''
+    ranges = []
+    for core in sorted(set(cores)):
+        if ranges and core == ranges[-1][1] + 1:
+            ranges[-1][1] = core
+        else:
+            ranges.append([core, core])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def available_cores():
+    '''Cores this process may run on (its affinity on Linux, all of them elsewhere), in ascending order'''
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def pin_current_process(cpuset):
+    '''Restricts the UPISAS process to the given cores (Linux only), e.g. away from the exemplar containers'''
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, parse_cpuset(cpuset))
+        return True
+    return False
+
+
+@dataclass(frozen=True)
+class ContainerResources:
+    """
+    CPU and memory resources of an exemplar container, to be varied as experiment factors.
+    `cpuset_cpus` pins the container to cores (e.g. "0-3"), `cpus` caps its CPU time (e.g. 1.5 cores, as a
+    CFS quota) and `mem_limit` caps its memory (e.g. "2g", with swap disabled so runs are reproducible).
+    Unset (None) resources are left as they are.
+    """
+    cpuset_cpus: str = None
+    cpus: float = None
+    mem_limit: str = None
+
+    def __post_init__(self):
+        if self.cpuset_cpus is not None:
+            parse_cpuset(self.cpuset_cpus)
+        if self.cpus is not None and self.cpus <= 0:
+            raise ValueError("cpus must be positive")
+
+    @classmethod
+    def from_run_variation(cls, run_variation):
+        '''Resources named as factors of an Experiment Runner run variation (other factors are ignored)'''
+        values = {field.name: run_variation.get(field.name) for field in fields(cls)}
+        if values["cpus"] is not None:
+            values["cpus"] = float(values["cpus"])
+        return cls(**values)
+
+    def merged(self, other):
+        '''These resources, overridden by the ones set in `other`'''
+        return replace(self, **{key: value for key, value in asdict(other).items() if value is not None})
+
+    def to_docker_kwargs(self):
+        '''Keyword arguments of docker's containers.create() and Container.update()'''
+        kwargs = {}
+        if self.cpuset_cpus is not None:
+            kwargs["cpuset_cpus"] = str(self.cpuset_cpus)
+        if self.cpus is not None:
+            kwargs["cpu_period"] = CPU_PERIOD
+            kwargs["cpu_quota"] = int(self.cpus * CPU_PERIOD)
+        if self.mem_limit is not None:
+            kwargs["mem_limit"] = self.mem_limit
+            kwargs["memswap_limit"] = self.mem_limit
+        return kwargs
+
+    def as_dict(self):
+        return asdict(self)
+
+    def save(self, path):
+        '''Records the resources of a run, e.g. in its run_dir'''
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=4)
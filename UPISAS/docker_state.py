@@ -0,0 +1,130 @@
+import logging
+import threading
+
+import docker
+
+_docker_client = None
+_container_states = None
+_lock = threading.Lock()
+
+# Container event action -> status reported by the Docker API
+EVENT_STATUS = {
+    "create": "created",
+    "start": "running",
+    "restart": "running",
+    "unpause": "running",
+    "pause": "paused",
+    "die": "exited",
+    "stop": "exited",
+    "destroy": "removed",
+}
+
+
+def get_docker_client():
+    '''Process-wide Docker client, created on first use and shared by every exemplar'''
+    global _docker_client
+    with _lock:
+        if _docker_client is None:
+            _docker_client = docker.from_env()
+        return _docker_client
+
+
+def get_container_states():
+    '''Process-wide ContainerStateCache following the events of the shared Docker client'''
+    global _container_states
+    client = get_docker_client()
+    with _lock:
+        if _container_states is None:
+            _container_states = ContainerStateCache(client).start()
+        return _container_states
+
+
+class ContainerStateCache:
+    """
+    Status (and health) of containers by id, kept up to date by a thread following the Docker events stream,
+    so status queries do not cost an API round trip. Events are ordered by the daemon's own timestamps only, since
+    the host clock may be skewed against it: an event older than the last one applied is ignored. Lifecycle
+    operations write their outcome through with set(), which holds until the next event of the container.
+    While the stream is down, nothing is served from the cache.
+    """
+
+    def __init__(self, client, reconnect_delay=1.0):
+        self.client = client
+        self.reconnect_delay = reconnect_delay
+        self._states = {}
+        self._health = {}
+        self._lock = threading.Lock()
+        self._events = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self.connected = False
+
+    def start(self):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._follow, name="docker-events", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._events is not None:
+            self._events.close()
+
+    def status(self, container_id):
+        '''Cached status of the container, or None when it has to be fetched from the API'''
+        with self._lock:
+            if not self.connected or container_id not in self._states:
+                return None
+            return self._states[container_id][0]
+
+    def health(self, container_id):
+        '''Cached health status ("starting", "healthy", "unhealthy"), or None when unknown'''
+        with self._lock:
+            return self._health.get(container_id) if self.connected else None
+
+    def set(self, container_id, status, timestamp_ns=None):
+        '''Records the status of a container, unless an event more recent than daemon time `timestamp_ns` is known'''
+        with self._lock:
+            known = self._states.get(container_id)
+            if timestamp_ns is None:
+                # Written by this process: keeps the daemon time of the last event applied
+                self._states[container_id] = (status, known[1] if known else 0)
+            elif known is None or known[1] <= timestamp_ns:
+                self._states[container_id] = (status, timestamp_ns)
+
+    def forget(self, container_id):
+        with self._lock:
+            self._states.pop(container_id, None)
+            self._health.pop(container_id, None)
+
+    def apply_event(self, event):
+        container_id = event.get("id") or event.get("Actor", {}).get("ID")
+        action = event.get("Action") or event.get("status", "")
+        timestamp_ns = event.get("timeNano") or int(event.get("time", 0) * 1e9)
+        if action.startswith("health_status: "):
+            with self._lock:
+                self._health[container_id] = action[len("health_status: "):]
+        elif action in EVENT_STATUS:
+            self.set(container_id, EVENT_STATUS[action], timestamp_ns)
+            if action in ("start", "restart", "destroy"):
+                with self._lock:
+                    self._health.pop(container_id, None)
+
+    def _follow(self):
+        while not self._stopped.is_set():
+            try:
+                self._events = self.client.events(decode=True, filters={"type": "container"})
+                with self._lock:
+                    self.connected = True
+                for event in self._events:
+                    self.apply_event(event)
+            except Exception as e:
+                if not self._stopped.is_set():
+                    logging.warning(f"docker events stream interrupted: {e}")
+            finally:
+                with self._lock:
+                    # Events may be missed until reconnected, so the cache cannot be trusted anymore
+                    self.connected = False
+                    self._states.clear()
+                    self._health.clear()
+            self._stopped.wait(self.reconnect_delay)
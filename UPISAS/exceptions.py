@@ -16,3 +16,11 @@ class EndpointNotReachable(UPISASException):
 
 class IncompleteJSONSchema(UPISASException):
     pass
+
+
+class ExemplarNotReady(UPISASException):
+    pass
+
+
+class ExemplarResetFailed(UPISASException):
+    pass
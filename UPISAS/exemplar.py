@@ -1,10 +1,16 @@
 import docker
+import posixpath
+import time
+from urllib.parse import urlsplit, urlunsplit
 from abc import ABC, abstractmethod
 from rich.progress import Progress
-from UPISAS import show_progress
+from UPISAS import show_progress, create_session
 import logging
+import requests
 from docker.errors import DockerException
-from UPISAS.exceptions import DockerImageNotFoundOnDockerHub
+from UPISAS.docker_state import get_docker_client, get_container_states
+from UPISAS.exceptions import DockerImageNotFoundOnDockerHub, ExemplarNotReady, ExemplarResetFailed
+from UPISAS.telemetry import ContainerTelemetry
 
 logging.getLogger().setLevel(logging.INFO)
 
@@ -14,50 +20,61 @@ class Exemplar(ABC):
     A class which encapsulates a self-adaptive exemplar run in a docker container.
     """
     _container_name = ""
+    http_pool_connections = 4
+    http_pool_maxsize = 8
+    # Endpoint polled by wait_until_ready(), relative to base_endpoint
+    readiness_endpoint = ""
+    # Container ports published on the host, remapped by `host_ports` (e.g. by an ExemplarFleet)
+    docker_ports = ()
+    # Event-driven ContainerStateCache answering get_container_status(), if any
+    container_states = None
+    # ContainerResources applied to the container, if any
+    resources = None
+    # ContainerTelemetry streaming docker stats, while started
+    telemetry = None
 
     def __init__(self, base_endpoint: "string with the URL of the exemplar's HTTP server", \
                  docker_kwargs,
-                 auto_start: "Whether to immediately start the container after creation" = False):
+                 auto_start: "Whether to immediately start the container after creation" = False,
+                 host_ports: "Host port per container port, overriding the ports of docker_kwargs" = None,
+                 resources: "ContainerResources (CPU set, CPU quota, memory limit) of the container" = None):
         '''Create an instance of the Exemplar class'''
         self.base_endpoint = base_endpoint
-        image_name = docker_kwargs["image"]
+        self.session = create_session(self.http_pool_connections, self.http_pool_maxsize)
+        self.docker_kwargs = docker_kwargs
+        self.resources = resources
+        if host_ports:
+            self._use_host_ports(host_ports)
+        self.warm_pool = False
+        self.reset_hook = None
+        self.filesystem_snapshots = {}
         container_name = docker_kwargs.get("name")  # Optional container name to uniquely identify
-        image_owner = image_name.split("/")[0]
 
         try:
-            docker_client = docker.from_env()
+            docker_client = get_docker_client()
+            self.container_states = get_container_states()
 
             # Check if the container already exists
-            existing_containers = docker_client.containers.list(all=True, filters={"name": container_name})
-            if existing_containers:
-                self.exemplar_container = existing_containers[0]
+            existing_container = self._find_container(docker_client, container_name)
+            if existing_container and host_ports and self._published_ports(existing_container) != \
+                    self.docker_kwargs.get("ports"):
+                # Ports are fixed at creation: the container would not listen on the host ports asked for
+                logging.info(f"Container '{container_name}' is published on other ports, recreating it.")
+                existing_container.remove(force=True)
+                existing_container = None
+            if existing_container:
+                self.exemplar_container = existing_container
+                if resources:
+                    self.apply_resources(resources)
                 if self.exemplar_container.status == "running":
                     logging.info(f"Container '{container_name}' is already running.")
                     return
                 else:
                     logging.info(f"Container '{container_name}' exists but is not running. Starting it...")
-                    self.exemplar_container.start()
+                    self._lifecycle("start", "running")
                     return
 
-            # Handle the Docker image
-            try:
-                docker_client.images.get(image_name)
-                logging.info(f"Image '{image_name}' found locally.")
-            except docker.errors.ImageNotFound:
-                logging.info(f"Image '{image_name}' not found locally.")
-                images_from_owner = docker_client.images.search(image_owner)
-                if image_name.split(":")[0] in [i["name"] for i in images_from_owner]:
-                    logging.info(f"Image '{image_name}' found on DockerHub, pulling it.")
-                    with Progress() as progress:
-                        for line in docker_client.api.pull(image_name, stream=True, decode=True):
-                            show_progress(line, progress)
-                else:
-                    logging.error(f"Image '{image_name}' not found on DockerHub, exiting!")
-                    raise DockerImageNotFoundOnDockerHub
-
-            # Create the container
-            docker_kwargs["detach"] = True
-            self.exemplar_container = docker_client.containers.create(**docker_kwargs)
+            self.create_container(docker_client)
 
         except DockerException as e:
             # Handle Docker-related exceptions
@@ -71,6 +88,206 @@ class Exemplar(ABC):
     def start_run(self):
         pass
 
+    @staticmethod
+    def _find_container(docker_client, container_name):
+        '''The container with exactly this name, if any (docker matches name filters as regular expressions)'''
+        if not container_name:
+            return None
+        containers = docker_client.containers.list(all=True, filters={"name": f"^/{container_name}$"})
+        return next((container for container in containers if container.name == container_name), None)
+
+    @staticmethod
+    def _published_ports(container):
+        '''Host port per container port the container was created with, like the "ports" of docker_kwargs'''
+        bindings = container.attrs.get("HostConfig", {}).get("PortBindings") or {}
+        return {int(port.split("/")[0]): int(binding[0]["HostPort"])
+                for port, binding in bindings.items() if binding and binding[0].get("HostPort")}
+
+    def rebind_host_ports(self, host_ports):
+        '''Moves the container to other host ports, e.g. after a port conflict; the container is recreated'''
+        self._use_host_ports(host_ports)
+        if self.exemplar_container:
+            try:
+                self._lifecycle("remove", "removed", force=True)
+            except docker.errors.NotFound:
+                pass
+            self.exemplar_container = None
+        return self.create_container()
+
+    def _use_host_ports(self, host_ports):
+        '''Publishes container ports on the given host ports, and moves base_endpoint to its new host port'''
+        ports = dict(self.docker_kwargs.get("ports", {}))
+        url = urlsplit(self.base_endpoint)
+        endpoint_port = url.port
+        for container_port, host_port in host_ports.items():
+            if endpoint_port is not None and ports.get(container_port) == endpoint_port:
+                url = url._replace(netloc=f"{url.hostname}:{host_port}")
+            ports[container_port] = host_port
+        self.docker_kwargs = dict(self.docker_kwargs, ports=ports)
+        self.base_endpoint = urlunsplit(url)
+
+    def host_url(self, container_port):
+        '''URL under which the given container port is published on the host'''
+        url = urlsplit(self.base_endpoint)
+        return f"{url.scheme}://{url.hostname}:{self.docker_kwargs['ports'][container_port]}"
+
+    def create_container(self, docker_client=None):
+        '''Creates the container from docker_kwargs, pulling its image from DockerHub if it is not found locally'''
+        docker_client = docker_client or get_docker_client()
+        image_name = self.docker_kwargs["image"]
+        image_owner = image_name.split("/")[0]
+
+        # Handle the Docker image
+        try:
+            docker_client.images.get(image_name)
+            logging.info(f"Image '{image_name}' found locally.")
+        except docker.errors.ImageNotFound:
+            logging.info(f"Image '{image_name}' not found locally.")
+            images_from_owner = docker_client.images.search(image_owner)
+            if image_name.split(":")[0] in [i["name"] for i in images_from_owner]:
+                logging.info(f"Image '{image_name}' found on DockerHub, pulling it.")
+                with Progress() as progress:
+                    for line in docker_client.api.pull(image_name, stream=True, decode=True):
+                        show_progress(line, progress)
+            else:
+                logging.error(f"Image '{image_name}' not found on DockerHub, exiting!")
+                raise DockerImageNotFoundOnDockerHub
+
+        # Create the container
+        self.docker_kwargs["detach"] = True
+        resource_kwargs = self.resources.to_docker_kwargs() if self.resources else {}
+        self.exemplar_container = docker_client.containers.create(**self.docker_kwargs, **resource_kwargs)
+        return self.exemplar_container
+
+    def apply_resources(self, resources):
+        '''Applies CPU and memory resources to the container, live, on top of those applied before;
+        returns all the resources in effect, to be recorded with the run'''
+        self.resources = self.resources.merged(resources) if self.resources else resources
+        docker_kwargs = self.resources.to_docker_kwargs()
+        if self.exemplar_container and docker_kwargs:
+            self.exemplar_container.update(**docker_kwargs)
+        return self.resources
+
+    def enable_warm_pool(self, reset_hook=None, snapshot_paths=None):
+        '''Keeps the container alive across runs: release() resets it to a clean state instead of removing it.
+        The reset runs `reset_hook(exemplar)` if given; otherwise it restores the files under `snapshot_paths`,
+        as archived now, and restarts the container. The container is only recreated when the reset fails.'''
+        self.warm_pool = True
+        self.reset_hook = reset_hook
+        self.filesystem_snapshots = {}
+        for path in snapshot_paths or []:
+            bits, _ = self.exemplar_container.get_archive(path)
+            self.filesystem_snapshots[path] = b"".join(bits)
+            logging.info(f"snapshot of '{path}' taken for warm container reuse")
+
+    def release(self):
+        '''Ends a run: resets the container in warm-pool mode, otherwise stops and removes it'''
+        if self.warm_pool:
+            return self.reset()
+        return self.stop_container()
+
+    def reset(self):
+        '''Brings the warm container back to a clean state, recreating it if the reset fails'''
+        try:
+            if self.reset_hook:
+                self.reset_hook(self)
+            else:
+                for path, archive in self.filesystem_snapshots.items():
+                    exit_code, output = self.exemplar_container.exec_run(["rm", "-rf", path])
+                    if exit_code != 0:
+                        raise ExemplarResetFailed(f"removing '{path}' exited with {exit_code}: {output!r}")
+                    if not self.exemplar_container.put_archive(posixpath.dirname(path.rstrip("/")) or "/", archive):
+                        raise ExemplarResetFailed(f"restoring the snapshot of '{path}' failed")
+                logging.info("restarting container...")
+                self._lifecycle("restart", "running")
+            return True
+        except Exception as e:
+            logging.warning(f"cannot reset container ({e}), recreating it")
+            return self.recreate_container()
+
+    def recreate_container(self):
+        '''Replaces the container by a new one made from docker_kwargs, and starts it'''
+        if self.exemplar_container:
+            try:
+                self._lifecycle("remove", "removed", force=True)
+            except docker.errors.NotFound:
+                pass
+            self.exemplar_container = None
+        self.create_container()
+        return self.start_container()
+
+    def start_telemetry(self, knowledge, interval=1.0, on_sample=None, capacity=3600):
+        '''Streams the CPU, memory, network and block I/O usage of the container into knowledge.telemetry_data,
+        every `interval` seconds (at most one sample per second), from a background thread; the last `capacity`
+        samples are kept'''
+        self.stop_telemetry()
+        self.telemetry = ContainerTelemetry(self.exemplar_container, knowledge, interval, on_sample, capacity).start()
+        return self.telemetry
+
+    def stop_telemetry(self):
+        if self.telemetry:
+            self.telemetry.stop()
+            self.telemetry = None
+
+    def configure_session(self, pool_connections=None, pool_maxsize=None, pool_block=False):
+        '''Replaces the keep-alive HTTP session shared by the strategies talking to this exemplar; the pool sizes
+        default to http_pool_connections and http_pool_maxsize'''
+        self.close_session()
+        self.session = create_session(pool_connections or self.http_pool_connections,
+                                      pool_maxsize or self.http_pool_maxsize, pool_block)
+        return self.session
+
+    def close_session(self):
+        '''Closes the pooled connections to the exemplar's HTTP server'''
+        if self.session:
+            self.session.close()
+
+    def wait_until_ready(self, endpoint_suffix=None, timeout=120, http_probe=True, container_probe=True,
+                         ready_status=None, url=None, initial_delay=0.1, max_delay=5.0, backoff=2.0):
+        '''Blocks until the exemplar is ready, polling with exponential backoff from `initial_delay` up to `max_delay`.
+        Ready means the container is running (and healthy, if it has a health check) and the HTTP endpoint
+        (`url`, or `endpoint_suffix` under base_endpoint) answers with a status in `ready_status` (any status
+        below 500 by default). Returns the seconds waited; raises ExemplarNotReady after `timeout` seconds.'''
+        if url is None:
+            suffix = self.readiness_endpoint if endpoint_suffix is None else endpoint_suffix
+            url = '/'.join([self.base_endpoint, suffix]) if suffix else self.base_endpoint
+        start = time.monotonic()
+        deadline = start + timeout
+        delay = initial_delay
+        attempts = 0
+        while True:
+            attempts += 1
+            probe_timeout = max(0.1, min(max_delay, deadline - time.monotonic()))
+            ready = (not container_probe or self.container_is_ready()) and \
+                    (not http_probe or self.http_is_ready(url, ready_status, probe_timeout))
+            now = time.monotonic()
+            if ready:
+                logging.info(f"exemplar ready after {now - start:.2f}s ({attempts} probes)")
+                return now - start
+            if now >= deadline:
+                logging.error(f"exemplar not ready after {timeout}s ({attempts} probes)")
+                raise ExemplarNotReady(f"{url} not ready after {timeout}s")
+            time.sleep(min(delay, deadline - now))
+            delay = min(max_delay, delay * backoff)
+
+    def container_is_ready(self):
+        '''Container probe: running, and healthy if the image defines a health check'''
+        if self.get_container_status() != "running":
+            return False
+        health = self.container_states.health(self.exemplar_container.id) if self.container_states else None
+        if health is None:
+            self.exemplar_container.reload()
+            health = self.exemplar_container.attrs.get("State", {}).get("Health", {}).get("Status")
+        return health is None or health == "healthy"
+
+    def http_is_ready(self, url, ready_status=None, timeout=5.0):
+        '''HTTP probe: `url` answers with a status in `ready_status`, or with any status below 500 by default'''
+        try:
+            response = self.session.get(url, timeout=timeout)
+        except requests.exceptions.RequestException:
+            return False
+        return response.status_code < 500 if ready_status is None else response.status_code in ready_status
+
     def start_container(self):
         '''Starts running the docker container made from the given image when constructing this class'''
         try:
@@ -79,7 +296,7 @@ class Exemplar(ABC):
                 logging.warning("container already running...")
             else:
                 logging.info("starting container...")
-                self.exemplar_container.start()
+                self._lifecycle("start", "running")
             return True
         except docker.errors.NotFound as e:
             logging.error(e)
@@ -91,13 +308,13 @@ class Exemplar(ABC):
             if container_status == "exited":
                 logging.warning("container already stopped...")
                 if remove:
-                    self.exemplar_container.remove()
+                    self._lifecycle("remove", "removed")
                     self.exemplar_container = None
             else:
                 logging.info("stopping container...")
-                self.exemplar_container.stop()
+                self._lifecycle("stop", "exited")
                 if remove:
-                    self.exemplar_container.remove()
+                    self._lifecycle("remove", "removed")
                     self.exemplar_container = None
             return True
         except docker.errors.NotFound as e:
@@ -110,7 +327,7 @@ class Exemplar(ABC):
             container_status = self.get_container_status()
             if container_status == "running":
                 logging.info("pausing container...")
-                self.exemplar_container.pause()
+                self._lifecycle("pause", "paused")
                 return True
             elif container_status == "paused":
                 logging.warning("container already paused...")
@@ -128,7 +345,7 @@ class Exemplar(ABC):
             container_status = self.get_container_status()
             if container_status == "paused":
                 logging.info("unpausing container...")
-                self.exemplar_container.unpause()
+                self._lifecycle("unpause", "running")
                 return True
             elif container_status == "running":
                 logging.warning("container already running (why unpause it?)...")
@@ -142,6 +359,21 @@ class Exemplar(ABC):
 
     def get_container_status(self):
         if self.exemplar_container:
-            self.exemplar_container.reload()
-            return self.exemplar_container.status
+            status = self.container_states.status(self.exemplar_container.id) if self.container_states else None
+            if status is None:
+                self.exemplar_container.reload()
+                status = self.exemplar_container.status
+                if self.container_states:
+                    self.container_states.set(self.exemplar_container.id, status)
+            return status
         return "removed"
+
+    def _lifecycle(self, operation, status, **kwargs):
+        '''Performs a lifecycle operation on the container and writes the resulting status through to the cache'''
+        container = self.exemplar_container
+        getattr(container, operation)(**kwargs)
+        if self.container_states:
+            if status == "removed":
+                self.container_states.forget(container.id)
+            else:
+                self.container_states.set(container.id, status)
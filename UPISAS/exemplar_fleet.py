@@ -0,0 +1,126 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import socket
+
+import docker
+
+
+def allocate_free_ports(count, host=""):
+    '''Returns `count` distinct TCP ports that are free on the host (all sockets are held until all are found).
+    They are released before docker binds them, so another process may take one first: see is_port_conflict()'''
+    sockets = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind((host, 0))
+            sockets.append(sock)
+        return [sock.getsockname()[1] for sock in sockets]
+    finally:
+        for sock in sockets:
+            sock.close()
+
+
+def is_port_conflict(error):
+    '''Whether a docker error reports that a host port to publish is already in use'''
+    message = str(error).lower()
+    return isinstance(error, docker.errors.APIError) and \
+        ("port is already allocated" in message or "address already in use" in message)
+
+
+class ExemplarFleet:
+    """
+    N instances of an Exemplar subclass running side by side on one host.
+    Each instance gets a unique container name ("<name_prefix>-<i>") and free host ports for the
+    `docker_ports` of its class, so its base_endpoint points to its own container. Instances are created,
+    started, probed and stopped concurrently. Every instance can be handed to its own strategy.
+    A port taken by another process between its allocation and its binding by docker is replaced by a new free
+    port, up to `port_retries` times per instance.
+    """
+
+    def __init__(self, exemplar_class, size, name_prefix=None, port_retries=3, **exemplar_kwargs):
+        if not exemplar_class.docker_ports:
+            raise ValueError(f"{exemplar_class.__name__} does not declare its docker_ports")
+        self.exemplar_class = exemplar_class
+        self.size = size
+        self.name_prefix = name_prefix or f"upisas-{exemplar_class.__name__.lower()}"
+        self.port_retries = port_retries
+        self.exemplar_kwargs = exemplar_kwargs
+        self.exemplars = []
+        self.strategies = []
+
+    def launch(self):
+        '''Creates the instances, with unique names and free host ports'''
+        ports = self.exemplar_class.docker_ports
+        free_ports = allocate_free_ports(self.size * len(ports))
+        host_ports = [dict(zip(ports, free_ports[i * len(ports):(i + 1) * len(ports)])) for i in range(self.size)]
+        self.exemplars = self._map(lambda i: self._create(i, host_ports[i]), range(self.size))
+        for exemplar in self.exemplars:
+            logging.info(f"fleet instance {exemplar.docker_kwargs.get('name')} at {exemplar.base_endpoint}")
+        return self.exemplars
+
+    def create_strategies(self, strategy_factory):
+        '''Hands every instance to its own strategy, made by `strategy_factory(exemplar)`'''
+        self.strategies = [strategy_factory(exemplar) for exemplar in self.exemplars]
+        return self.strategies
+
+    def start_all(self):
+        return self._map(self._start, self.exemplars)
+
+    def _create(self, index, host_ports):
+        for attempt in range(self.port_retries + 1):
+            try:
+                # An auto_start instance binds its ports here
+                return self.exemplar_class(container_name=f"{self.name_prefix}-{index}", host_ports=host_ports,
+                                           **self.exemplar_kwargs)
+            except docker.errors.APIError as e:
+                if not is_port_conflict(e) or attempt == self.port_retries:
+                    raise
+                logging.warning(f"fleet instance {index}: {e}, retrying on other ports")
+                host_ports = self._new_host_ports()
+
+    def _start(self, exemplar):
+        for attempt in range(self.port_retries + 1):
+            try:
+                return exemplar.start_container()
+            except docker.errors.APIError as e:
+                if not is_port_conflict(e) or attempt == self.port_retries:
+                    raise
+                logging.warning(f"fleet instance {exemplar.docker_kwargs.get('name')}: {e}, retrying on other ports")
+                exemplar.rebind_host_ports(self._new_host_ports())
+
+    def _new_host_ports(self):
+        ports = self.exemplar_class.docker_ports
+        return dict(zip(ports, allocate_free_ports(len(ports))))
+
+    def wait_until_ready(self, **kwargs):
+        '''Waits for every instance concurrently; see Exemplar.wait_until_ready()'''
+        return self._map(lambda exemplar: exemplar.wait_until_ready(**kwargs), self.exemplars)
+
+    def stop_all(self, remove=True):
+        results = self._map(lambda exemplar: exemplar.stop_container(remove), self.exemplars)
+        for exemplar in self.exemplars:
+            exemplar.close_session()
+        return results
+
+    def _map(self, function, items):
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=len(items), thread_name_prefix="exemplar-fleet") as executor:
+            return list(executor.map(function, items))
+
+    def __enter__(self):
+        self.launch()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop_all()
+
+    def __len__(self):
+        return len(self.exemplars)
+
+    def __getitem__(self, index):
+        return self.exemplars[index]
+
+    def __iter__(self):
+        return iter(self.exemplars)
@@ -1,6 +1,8 @@
 import docker
 import logging
+from UPISAS.docker_state import get_docker_client
 from UPISAS.exemplar import Exemplar
+from UPISAS.exemplars.switch_interface import SwitchInterface
 
 logging.getLogger().setLevel(logging.INFO)
 
@@ -9,13 +11,18 @@ class SwitchExemplar(Exemplar):
     """
     A class to manage the backend container for a self-adaptive system.
     """
+    readiness_endpoint = "adaptation_options"
+    docker_ports = (3001, 8089, 5001, 8000)
 
-    def __init__(self, auto_start: bool = False, container_name: str = "backend"):
+    def __init__(self, auto_start: bool = False, container_name: str = "backend", host_ports: dict = None,
+                 resources=None):
         """
         Initialize the SwitchExemplar with the backend Docker configuration.
 
         :param auto_start: Whether to immediately start the container after creation.
         :param container_name: Name of the backend Docker container.
+        :param host_ports: Host port per container port, to run several backends side by side.
+        :param resources: ContainerResources (CPU set, CPU quota, memory limit) of the backend container.
         """
         backend_docker_kwargs = {
             "name": container_name,
@@ -31,19 +38,40 @@ class SwitchExemplar(Exemplar):
             },
         }
 
-        super().__init__("http://localhost:8000", backend_docker_kwargs, auto_start)
+        super().__init__("http://localhost:8000", backend_docker_kwargs, auto_start, host_ports, resources)
+        # An existing backend container that was reused may not be on the ELK network yet
+        self.attach_to_network("elk")
+        # API client bound to this backend and its session
+        self.interface = SwitchInterface(self.session, self.base_endpoint)
 
-        # Attach the container to the ELK network
+    def create_container(self, docker_client=None):
+        container = super().create_container(docker_client)
+        # Attach the container to the ELK network, also when it is recreated
         self.attach_to_network("elk")
+        return container
+
+    def _use_host_ports(self, host_ports):
+        super()._use_host_ports(host_ports)
+        if getattr(self, "interface", None):
+            self.interface.base_url = self.base_endpoint
+
+    def configure_session(self, pool_connections=None, pool_maxsize=None, pool_block=False):
+        session = super().configure_session(pool_connections, pool_maxsize, pool_block)
+        if getattr(self, "interface", None):
+            self.interface.session = session
+        return session
 
     def attach_to_network(self, network_name):
         """
-        Attaches the container to a specified Docker network.
+        Attaches the container to a specified Docker network, unless it is already attached.
 
         :param network_name: Name of the Docker network to attach the container to.
         """
         try:
-            docker_client = docker.from_env()
+            self.exemplar_container.reload()
+            if network_name in self.exemplar_container.attrs.get("NetworkSettings", {}).get("Networks", {}):
+                return
+            docker_client = get_docker_client()
             network = docker_client.networks.get(network_name)
             network.connect(self.exemplar_container.id)
             logging.info(f"Container '{self.exemplar_container.name}' attached to network '{network_name}'.")
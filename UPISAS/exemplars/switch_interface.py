@@ -2,48 +2,72 @@
 
 import requests
 
-# Base URL of the FastAPI application
-base_url = "http://localhost:8000"
+from UPISAS import create_session
+
+
+class SwitchInterface:
+    """
+    Client of the SWITCH backend API. Every SwitchExemplar owns one, bound to its own base URL and keep-alive
+    session, so several backends can be driven side by side.
+    """
+
+    def __init__(self, session=None, base_url="http://localhost:8000"):
+        self.session = session or create_session()
+        self.base_url = base_url
+
+    def get_monitor_data(self):
+        url = f"{self.base_url}/monitor"
+        try:
+            response = self.session.get(url)
+            response.raise_for_status()
+            data = response.json()
+            return data
+        except requests.exceptions.HTTPError as err:
+            raise Exception(f"HTTP error occurred: {err} - {response.text}")
+        except Exception as err:
+            raise Exception(f"An error occurred: {err}")
+
+    def get_adaptation_options(self):
+        url = f"{self.base_url}/adaptation_options"
+        try:
+            response = self.session.get(url)
+            response.raise_for_status()
+            options = response.json()
+            return options
+        except requests.exceptions.HTTPError as err:
+            raise Exception(f"HTTP error occurred: {err} - {response.text}")
+        except Exception as err:
+            raise Exception(f"An error occurred: {err}")
+
+    def execute_action(self, option, new_value):
+        url = f"{self.base_url}/execute"
+        params = {
+            'option': option,
+            'new_value': new_value
+        }
+        try:
+            response = self.session.put(url, params=params)
+            response.raise_for_status()
+            result = response.json()
+            return result
+        except requests.exceptions.HTTPError as err:
+            raise Exception(f"HTTP error occurred: {err} - {response.text}")
+        except Exception as err:
+            raise Exception(f"An error occurred: {err}")
+
+
+# Interface to the default backend on localhost:8000, behind the module-level functions
+default_interface = SwitchInterface()
+
 
 def get_monitor_data():
-    url = f"{base_url}/monitor"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        return data
-    except requests.exceptions.HTTPError as err:
-        raise Exception(f"HTTP error occurred: {err} - {response.text}")
-    except Exception as err:
-        raise Exception(f"An error occurred: {err}")
+    return default_interface.get_monitor_data()
 
 def get_adaptation_options():
-    url = f"{base_url}/adaptation_options"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        options = response.json()
-        return options
-    except requests.exceptions.HTTPError as err:
-        raise Exception(f"HTTP error occurred: {err} - {response.text}")
-    except Exception as err:
-        raise Exception(f"An error occurred: {err}")
+    return default_interface.get_adaptation_options()
 
 def execute_action(option, new_value):
-    url = f"{base_url}/execute"
-    params = {
-        'option': option,
-        'new_value': new_value
-    }
-    try:
-        response = requests.put(url, params=params)
-        response.raise_for_status()
-        result = response.json()
-        return result
-    except requests.exceptions.HTTPError as err:
-        raise Exception(f"HTTP error occurred: {err} - {response.text}")
-    except Exception as err:
-        raise Exception(f"An error occurred: {err}")
+    return default_interface.execute_action(option, new_value)
 
 if __name__ == "__main__":
     # Get Monitor Data
@@ -10,11 +10,12 @@ from ProgressManager.Output.OutputProcedure import OutputProcedure as output
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os.path import dirname, realpath
-import time
 import statistics
 
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
+from UPISAS.container_resources import ContainerResources
 from UPISAS.exemplars.swim import SWIM
+from UPISAS.mapek_loop import MAPEKLoop, AdaptivePollingPolicy
 
 
 
@@ -63,6 +64,9 @@ class RunnerConfig:
         """Create and return the run_table model here. A run_table is a List (rows) of tuples (columns),
         representing each run performed"""
         factor1 = FactorModel("rt_threshold", [0.75, 0.50, 0.25])
+        # The SWIM container is unconstrained. To vary its resources, add factors named after the fields of
+        # ContainerResources, e.g. FactorModel("cpus", [1.0, 2.0]) or FactorModel("mem_limit", ["2g"]);
+        # a mem_limit also caps swap at the same value.
         self.run_table_model = RunTableModel(
             factors=[factor1],
             exclude_variations=[
@@ -80,9 +84,13 @@ class RunnerConfig:
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
-        self.exemplar = SWIM(auto_start=True)
+        if self.exemplar is None:
+            # A fresh container per run, unless a warm one was provided: call enable_warm_pool(reset_hook) with a
+            # hook bringing the exemplar back to a clean state to reuse it (as ParallelRunExecutor does)
+            self.exemplar = SWIM(auto_start=True)
         self.strategy = ReactiveAdaptationManager(self.exemplar)
-        time.sleep(3)
+        # The simulation is started inside the container, which only needs to be running
+        self.exemplar.wait_until_ready(http_probe=False)
         output.console_log("Config.before_run() called!")
 
     def start_run(self, context: RunnerContext) -> None:
@@ -90,9 +98,15 @@ class RunnerConfig:
         For example, starting the target system to measure.
         Activities after starting the run should also be performed here."""
         self.strategy.RT_THRESHOLD = float(context.run_variation['rt_threshold'])
+        self.strategy.attach_knowledge_log(context.run_dir / "knowledge.log")
+        # Apply the resource factors (on top of any CPU pinning) and record what the run got
+        resources = self.exemplar.apply_resources(ContainerResources.from_run_variation(context.run_variation))
+        resources.save(context.run_dir / "resources.json")
 
         self.exemplar.start_run()
-        time.sleep(3)
+        self.exemplar.wait_until_ready("monitor", ready_status=(200,))
+        # Container CPU, memory, network and block I/O usage, next to the monitored data
+        self.exemplar.start_telemetry(self.strategy.knowledge, interval=1.0, on_sample=self.strategy.log_telemetry)
         output.console_log("Config.start_run() called!")
 
     def start_measurement(self, context: RunnerContext) -> None:
@@ -101,22 +115,17 @@ class RunnerConfig:
 
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
-        time_slept = 0
         self.strategy.get_monitor_schema()
         self.strategy.get_adaptation_options_schema()
         self.strategy.get_execute_schema()
 
-        
-
-        while time_slept < 10:
-            
-            self.strategy.monitor(verbose=True)
-            if self.strategy.analyze():
-                if self.strategy.plan():
-                    self.strategy.execute()
-
-            time.sleep(3)
-            time_slept+=3
+        # Iterations every 1 to 6 seconds for 10 seconds, faster while the response time moves or nears its threshold
+        strategy = self.strategy
+        polling_policy = AdaptivePollingPolicy(["basic_rt", "arrival_rate"], min_period=1, max_period=6,
+                                               initial_period=3, thresholds={"basic_rt": lambda: (strategy.RT_THRESHOLD,)})
+        loop = MAPEKLoop(self.strategy, max_duration=10, polling_policy=polling_policy, monitor_kwargs={"verbose": True})
+        loop.run()
+        polling_policy.save_intervals(context.run_dir / "polling_intervals.txt")
 
 
         output.console_log("Config.interact() called!")
@@ -129,7 +138,13 @@ class RunnerConfig:
     def stop_run(self, context: RunnerContext) -> None:
         """Perform any activity here required for stopping the run.
         Activities after stopping the run should also be performed here."""
-        self.exemplar.stop_container()
+        self.exemplar.stop_telemetry()
+        self.exemplar.release()
+        if not self.exemplar.warm_pool:
+            self.exemplar = None  # Stopped and removed by release()
+        self.strategy.close_knowledge_log()
+        # Latency histograms per MAPE-K phase and HTTP endpoint
+        self.strategy.instrumentation.dump(context.run_dir / "latency.json")
         output.console_log("Config.stop_run() called!")
 
     def populate_run_data(self, context: RunnerContext) -> Optional[Dict[str, SupportsStr]]:
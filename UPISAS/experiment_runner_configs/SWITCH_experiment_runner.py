@@ -14,13 +14,26 @@ from ProgressManager.Output.OutputProcedure import OutputProcedure as output
 from typing import Dict, List, Any, Optional
 from pathlib import Path
 from os.path import dirname, realpath
-import time
 import statistics
 
+from UPISAS.aggregates import RunningMean
+from UPISAS.container_resources import ContainerResources
 from UPISAS.exemplars.switch_exemplar import SwitchExemplar
 from UPISAS.experiment_runner_configs.SwitchAPI import upload_files
+from UPISAS.mapek_loop import MAPEKLoop, AdaptivePollingPolicy
 from UPISAS.strategies.PredictiveSwitchStrategy import SwitchStrategy
 
+# Run data column -> monitored key, averaged incrementally while monitoring
+AVERAGED_COLUMNS = {
+    "confidence": "confidence",
+    "absolute_time_from_start": "absolute_time_from_start",
+    "cpu_utility": "cpu",
+    "detection_boxes": "detection_boxes",
+    "model_processing_time": "model_processing_time",
+    "image_processing_time": "image_processing_time",
+    "utility": "utility",
+}
+
 
 class RunnerConfig:
     ROOT_DIR = Path(dirname(realpath(__file__)))
@@ -63,6 +76,11 @@ class RunnerConfig:
         self.run_table_model = None  # Initialized later
         self.total_imgs = 10 # Smaller Experiment
         # self.total_imgs = 300  # Actual dataset was 300
+        # Learned thresholds, metric history and Optuna trials carried from one run to the next; the history and
+        # trials are dropped by attach_study() when the next run has another workload
+        self.snapshot_path = self.ROOT_DIR / "switch_strategy_snapshot.pkl.gz"
+        # Optuna threshold studies of every workload, resumed by the runs of later experiments too
+        self.study_journal_path = self.results_output_path / "switch_threshold_studies.journal"
 
         output.console_log("Custom config loaded")
 
@@ -74,6 +92,9 @@ class RunnerConfig:
         # A input.csv file is created with the input
         # A run.csv is the output
         factor1 = FactorModel("Inter arrival rate files", ["Set1"])
+        # The backend container is unconstrained. To vary its resources, add factors named after the fields of
+        # ContainerResources, e.g. FactorModel("cpus", [2.0, 4.0]) or FactorModel("mem_limit", ["4g"]);
+        # a mem_limit also caps swap at the same value, so leave room for the YOLO models.
         self.run_table_model = RunTableModel(
             factors=[factor1],
             exclude_variations=[
@@ -91,14 +112,20 @@ class RunnerConfig:
     def before_run(self) -> None:
         """Perform any activity required before starting a run.
         No context is available here as the run is not yet active (BEFORE RUN)"""
-        self.exemplar = SwitchExemplar(auto_start=True)
-        self.strategy = SwitchStrategy(self.exemplar)
-        time.sleep(3)
-
-        # Require user interaction before proceeding to the next run
-        # input("Reload the dataset. Start processing on Switch then press Enter to start the next experiment run...")
-        print("Once the backend is up, you need to go on localhost:3000 and hit refresh to load the yolo models")
-        input("Make sure the frontend, kibana and elastic search are already running!! Once the backend is fully up (and no longer waiting for kibana), press ENTER!")
+        if self.exemplar is None:
+            # A fresh container per run, unless a warm one was provided: call enable_warm_pool(reset_hook) with a
+            # hook bringing the exemplar back to a clean state to reuse it (as ParallelRunExecutor does)
+            self.exemplar = SwitchExemplar(auto_start=True)
+        snapshot_path = self.snapshot_path if self.snapshot_path.exists() else None
+        self.strategy = SwitchStrategy(self.exemplar, snapshot_path=snapshot_path, restore_knowledge=False)
+        for key in AVERAGED_COLUMNS.values():
+            self.strategy.subscribe_aggregate(key, "mean", RunningMean())
+
+        # The frontend, kibana and elastic search must already be running; the backend starts automatically.
+        # Wait until it answers, i.e. until it is no longer waiting for kibana.
+        self.exemplar.wait_until_ready(timeout=600)
+        # The yolo models are only loaded once the frontend is refreshed, which no endpoint reports: keep this gate
+        input("The backend is up. Go on localhost:3000 and hit refresh to load the yolo models, then press ENTER!")
 
         output.console_log("Config.before_run() called!")
 
@@ -110,13 +137,20 @@ class RunnerConfig:
         # self.strategy.RT_THRESHOLD = float(context.run_variation['rt_threshold'])
 
         output.console_log("start_run begin")
+        self.strategy.attach_knowledge_log(context.run_dir / "knowledge.log")
+        # Tune the thresholds in the persistent study of the inter arrival rate file of this run
+        self.strategy.attach_study(self.study_journal_path, workload=context.run_variation["Inter arrival rate files"])
+        # Apply the resource factors (on top of any CPU pinning) and record what the run got
+        resources = self.exemplar.apply_resources(ContainerResources.from_run_variation(context.run_variation))
+        resources.save(context.run_dir / "resources.json")
         self.exemplar.start_run()
-        time.sleep(3)
+        self.exemplar.wait_until_ready()
+        # Container CPU, memory, network and block I/O usage, next to the monitored data
+        self.exemplar.start_telemetry(self.strategy.knowledge, interval=1.0, on_sample=self.strategy.log_telemetry)
         output.console_log("Config.start_run() called!")
 
     def start_measurement(self, context: RunnerContext) -> None:
         """Perform any activity required for starting measurements."""
-        # TODO Create method that polls until turns on
         # self.strategy.get_monitor_schema()
         # self.strategy.get_adaptation_options_schema()
         # self.strategy.get_execute_schema()
@@ -124,37 +158,43 @@ class RunnerConfig:
 
     def interact(self, context: RunnerContext) -> None:
         """Perform any interaction with the running target system here, or block here until the target finishes."""
-        time_slept = 0
-        done = False
         # Endpoint URL
-        endpoint = "http://localhost:3001/api/upload"
+        endpoint = f"{self.exemplar.host_url(3001)}/api/upload"
 
         # File paths
         csv_path = "UPISAS/experiment_runner_configs/upload/var_rate_300.csv"
         zip_path = "UPISAS/experiment_runner_configs/upload/animals.zip"
 
-        time.sleep(10)
+        # Wait for the upload service of the backend
+        self.exemplar.wait_until_ready(url=self.exemplar.host_url(3001), container_probe=False)
 
         upload_files(endpoint, csv_path, zip_path)
 
         # Create Run Table file
 
-        while done == False:
-            self.strategy.monitor(verbose=True)
-            current_img = self.strategy.knowledge.monitored_data["log_id"][-1]
-            print("LOG_ID", current_img)
-            if self.strategy.analyze():
-                   if self.strategy.plan():
-                       if self.strategy.knowledge.plan_data is not None:
-                            self.strategy.execute()
-                       else:
-                           print("MAPE-K Loop: No adaptation")
-            time.sleep(1)
-            time_slept += 1
-            done = current_img == self.total_imgs
+        # Poll faster while the metrics move or approach the (tuned) thresholds, slower while they are flat
+        strategy = self.strategy
+        polling_policy = AdaptivePollingPolicy(
+            ["input_rate", "cpu", "confidence", "model_processing_time"], min_period=0.25, max_period=2,
+            initial_period=1, thresholds={
+                "cpu": lambda: (strategy.thresholds["cpu_utilization_upper"],
+                                strategy.thresholds["cpu_utilization_lower"]),
+                "confidence": lambda: (strategy.thresholds["confidence_lower"],),
+                "model_processing_time": lambda: (strategy.thresholds["processing_time_upper"],)})
+        loop = MAPEKLoop(self.strategy, stop_condition=self.all_images_processed, polling_policy=polling_policy,
+                         monitor_kwargs={"verbose": True})
+        loop.run()
+        polling_policy.save_intervals(context.run_dir / "polling_intervals.txt")
+        output.console_log(f"MAPE-K loop: {loop.iterations} iterations, {loop.overruns} overruns")
 
         output.console_log("Config.interact() called!")
 
+    def all_images_processed(self, strategy) -> bool:
+        """Stop condition of the MAPE-K loop: the last monitored image is the last one of the dataset."""
+        current_img = strategy.knowledge.monitored_data["log_id"][-1]
+        print("LOG_ID", current_img)
+        return current_img == self.total_imgs
+
     def stop_measurement(self, context: RunnerContext) -> None:
         """Perform any activity here required for stopping measurements."""
 
@@ -163,7 +203,16 @@ class RunnerConfig:
     def stop_run(self, context: RunnerContext) -> None:
         """Perform any activity here required for stopping the run.
         Activities after stopping the run should also be performed here."""
-        self.exemplar.stop_container()
+        self.exemplar.stop_telemetry()
+        self.exemplar.release()
+        if not self.exemplar.warm_pool:
+            self.exemplar = None  # Stopped and removed by release()
+        # The snapshot below then holds every trial of the run
+        self.strategy.stop_tuning()
+        self.strategy.close_knowledge_log()
+        # Latency histograms per MAPE-K phase, HTTP endpoint, prediction and threshold optimization
+        self.strategy.instrumentation.dump(context.run_dir / "latency.json")
+        self.strategy.save_snapshot(self.snapshot_path)
 
         output.console_log("You can end the current run. Manually starting the next run is required")
 
@@ -249,19 +298,10 @@ class RunnerConfig:
         print(f"CPU Utility: {cpu_utility}")
         print("Model Counts:", model_counts)
 
-        return {
-            "confidence": sum(confidence) / len(confidence) if confidence else 0,
-            "absolute_time_from_start": sum(absolute_time_from_start) / len(
-                absolute_time_from_start) if absolute_time_from_start else 0,
-            "cpu_utility": sum(cpu_utility) / len(cpu_utility) if cpu_utility else 0,
-            "detection_boxes": sum(detection_boxes) / len(detection_boxes) if detection_boxes else 0,
-            "model_processing_time": sum(model_processing_time) / len(
-                model_processing_time) if model_processing_time else 0,
-            "image_processing_time": sum(image_processing_time) / len(
-                image_processing_time) if image_processing_time else 0,
-            "utility": sum(utility) / len(utility) if utility else 0,
-            "model_counts": dict(model_counts)  # Return model counts for reference
-        }
+        aggregates = self.strategy.knowledge.aggregates
+        run_data = {column: aggregates[key]["mean"].value for column, key in AVERAGED_COLUMNS.items()}
+        run_data["model_counts"] = dict(model_counts)  # Return model counts for reference
+        return run_data
 
     def after_experiment(self) -> None:
         """Perform any activity required after stopping the experiment here
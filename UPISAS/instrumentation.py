@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+import json
+import threading
+import time
+
+
+class LatencyHistogram:
+    """
+    Histogram of latencies with HDR-style log-linear buckets: every power of two of microseconds is split into
+    2 ** `significant_bits` linear sub-buckets, so percentiles are exact to within 1 / 2 ** `significant_bits`
+    (about 3% by default) at any magnitude, in constant memory. Recording is O(1) and thread safe.
+    """
+
+    def __init__(self, significant_bits=5):
+        self.significant_bits = significant_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        micros = max(0, int(seconds * 1e6))
+        shift = max(0, micros.bit_length() - self.significant_bits - 1)
+        bucket = (shift, micros >> shift)
+        with self._lock:
+            self.counts[bucket] = self.counts.get(bucket, 0) + 1
+            self.count += 1
+            self.total += seconds
+            self.min = seconds if self.min is None else min(self.min, seconds)
+            self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def buckets(self):
+        '''Returns (lower, upper, count) per non-empty bucket, in seconds and in increasing order'''
+        with self._lock:
+            counts = sorted(self.counts.items())
+        return [((mantissa << shift) / 1e6, ((mantissa + 1) << shift) / 1e6, count)
+                for (shift, mantissa), count in counts]
+
+    def percentile(self, percentile):
+        '''Upper bound of the bucket holding the `percentile` (0-100) latency, in seconds'''
+        if not self.count:
+            return 0
+        rank = percentile / 100 * self.count
+        seen = 0
+        for lower, upper, count in self.buckets():
+            seen += count
+            if seen >= rank:
+                return min(upper, self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self):
+        return {"count": self.count, "total": self.total, "mean": self.mean, "min": self.min or 0,
+                "p50": self.percentile(50), "p90": self.percentile(90), "p99": self.percentile(99),
+                "max": self.max or 0}
+
+
+class Instrumentation:
+    """
+    Latency histograms keyed by name, e.g. one per MAPE-K phase ("monitor", "analyze", "plan", "execute")
+    and one per HTTP endpoint ("GET monitor", "PUT execute"). Disabled instrumentation records nothing.
+    """
+
+    def __init__(self, enabled=True, significant_bits=5):
+        self.enabled = enabled
+        self.significant_bits = significant_bits
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram(self.significant_bits))
+        return histogram
+
+    def record(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).record(seconds)
+
+    @contextmanager
+    def timer(self, name):
+        '''Records the time spent in the with-block under `name`, also when it raises'''
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter() - start)
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path):
+        '''Writes the summary and the buckets of every histogram to `path` as JSON'''
+        report = {name: dict(histogram.summary(), buckets=histogram.buckets())
+                  for name, histogram in sorted(self.histograms.items())}
+        with open(path, "w") as file:
+            json.dump(report, file, indent=4)
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
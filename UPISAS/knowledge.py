@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
 
 
 @dataclass
@@ -12,3 +12,31 @@ class Knowledge:
     monitor_schema: dict
     execute_schema: dict
     adaptation_options_schema: dict
+
+    # CompiledSchema per schema slot name (e.g. "monitor_schema"), rebuilt when the slot is reassigned
+    validators: dict = field(default_factory=dict)
+    # Aggregate per monitored key and name, updated on every monitored sample (see UPISAS.aggregates)
+    aggregates: dict = field(default_factory=dict)
+    # Container resource usage, a TelemetryStore (see UPISAS.telemetry) streamed from docker stats by the Exemplar
+    telemetry_data: dict = field(default_factory=dict)
+
+    # Fields rebuilt at runtime or describing a single run, left out of snapshots and ignored when restoring
+    _transient = ("validators", "aggregates", "telemetry_data")
+
+    def snapshot(self):
+        '''Returns the content of this Knowledge as plain Python objects, for saving to a snapshot file'''
+        state = {f.name: getattr(self, f.name) for f in fields(self) if f.name not in self._transient}
+        state["monitored_data"] = {key: values.tolist() if hasattr(values, "tolist") else list(values)
+                                   for key, values in self.monitored_data.items()}
+        return state
+
+    def restore(self, state):
+        '''Loads a snapshot() into this Knowledge, keeping the current monitored_data backend'''
+        for name, value in state.items():
+            if name in self._transient:
+                continue
+            if name == "monitored_data":
+                for key, values in value.items():
+                    self.monitored_data[key] = list(values)
+            else:
+                setattr(self, name, value)
@@ -0,0 +1,157 @@
+from pathlib import Path
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+MAGIC = b"UPISAS-KNOWLEDGE-LOG-1\n"
+# payload length, record kind, unix timestamp
+RECORD_HEADER = struct.Struct("<IBd")
+KINDS = {"monitor": 1, "analysis": 2, "plan": 3, "execute": 4, "telemetry": 5}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+
+
+def _to_json(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def _complete_length(file):
+    '''Length of the magic and the complete records at the start of `file`, reading only the record headers'''
+    file.seek(0, os.SEEK_END)
+    end = file.tell()
+    file.seek(0)
+    magic = file.read(len(MAGIC))
+    if magic != MAGIC:
+        if MAGIC.startswith(magic):
+            return 0  # The magic itself was cut short
+        raise ValueError(f"{file.name} is not a knowledge log")
+    offset = len(MAGIC)
+    while offset + RECORD_HEADER.size <= end:
+        length, _, _ = RECORD_HEADER.unpack(file.read(RECORD_HEADER.size))
+        if offset + RECORD_HEADER.size + length > end:
+            break
+        offset += RECORD_HEADER.size + length
+        file.seek(offset)
+    return offset
+
+
+class KnowledgeLog:
+    """
+    Append-only binary log of the MAPE-K activity of a Strategy: monitored samples, analysis results, plans and
+    executed adaptations, and container telemetry. Every record is written and flushed as it happens, so a crashed
+    run keeps its trace; a record it left truncated is cut off when the log is reopened, before appending.
+    Records may be appended from several threads.
+    A record is a fixed header (payload length, kind, timestamp) followed by a JSON payload.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._file = open(self.path, "r+b" if self.path.exists() else "w+b")
+        try:
+            length = _complete_length(self._file)
+        except Exception:
+            self._file.close()
+            raise
+        self._file.truncate(length)
+        self._file.seek(length)
+        if length == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    def append(self, kind, payload, timestamp=None):
+        body = json.dumps(payload, default=_to_json).encode()
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._file.write(RECORD_HEADER.pack(len(body), KINDS[kind], timestamp) + body)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class KnowledgeLogReader:
+    """
+    Reads a KnowledgeLog through a memory map. Records are located by scanning only their headers; payloads are
+    decoded lazily, one record at a time. A record truncated by a crash at the end of the log is ignored.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        size = Path(path).stat().st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a knowledge log")
+        self._offsets, self._kinds, self._timestamps = self._scan()
+
+    def _scan(self):
+        offsets, kinds, timestamps = [], [], []
+        offset, end = len(MAGIC), len(self._map)
+        while offset + RECORD_HEADER.size <= end:
+            length, kind, timestamp = RECORD_HEADER.unpack_from(self._map, offset)
+            if offset + RECORD_HEADER.size + length > end:
+                break
+            offsets.append(offset)
+            kinds.append(kind)
+            timestamps.append(timestamp)
+            offset += RECORD_HEADER.size + length
+        return np.array(offsets, dtype=np.int64), np.array(kinds, dtype=np.uint8), np.array(timestamps)
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def count(self, kind):
+        return int(np.count_nonzero(self._kinds == KINDS[kind]))
+
+    def timestamps(self, kind=None):
+        '''Timestamps of all records, or of the records of one kind, as a NumPy array'''
+        return self._timestamps if kind is None else self._timestamps[self._kinds == KINDS[kind]]
+
+    def record(self, index):
+        '''Returns the (kind, timestamp, payload) of the index-th record'''
+        offset = int(self._offsets[index])
+        length, kind, timestamp = RECORD_HEADER.unpack_from(self._map, offset)
+        start = offset + RECORD_HEADER.size
+        return KIND_NAMES[kind], timestamp, json.loads(bytes(self._map[start:start + length]))
+
+    def records(self, kind=None):
+        '''Yields the (kind, timestamp, payload) of all records, or of the records of one kind'''
+        indices = range(len(self)) if kind is None else np.flatnonzero(self._kinds == KINDS[kind])
+        for index in indices:
+            yield self.record(index)
+
+    def column(self, key, kind="monitor", dtype=None):
+        '''Values of `key` across the records of one kind, e.g. every monitored "cpu" value'''
+        return np.array([payload.get(key) for _, _, payload in self.records(kind)], dtype=dtype)
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
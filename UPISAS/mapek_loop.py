@@ -0,0 +1,237 @@
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import time
+
+
+class MAPEKLoop:
+    """
+    Drives the MAPE-K loop of a Strategy at a fixed period.
+    Iterations are scheduled on a monotonic clock at start + k * period, so the time spent monitoring, analyzing,
+    planning and executing does not make the sampling period drift. An iteration that ends after the next start
+    is an overrun: the next iteration starts right away, and whole periods that were missed are skipped.
+    With a `polling_policy` (e.g. AdaptivePollingPolicy) the period is chosen again after every iteration.
+    The loop ends after `max_iterations`, when the next iteration would start more than `max_duration` seconds
+    after the first one, when `stop_condition(strategy)` returns True, or when stop() is called.
+    """
+
+    def __init__(self, strategy, period=1.0, stop_condition=None, max_iterations=None, execute=True,
+                 monitor_kwargs=None, clock=time.monotonic, sleep=time.sleep, polling_policy=None, max_duration=None):
+        self.strategy = strategy
+        self.period = period
+        self.polling_policy = polling_policy
+        self.stop_condition = stop_condition
+        self.max_iterations = max_iterations
+        self.max_duration = max_duration
+        self.execute = execute
+        self.monitor_kwargs = monitor_kwargs or {}
+        self.clock = clock
+        self.sleep = sleep
+        self.iterations = 0
+        self.executions = 0
+        self.overruns = 0
+        self.skipped_periods = 0
+        self._stopped = False
+
+    def stop(self):
+        '''Ends the loop after the current iteration'''
+        self._stopped = True
+
+    def iterate(self):
+        '''Runs a single Monitor-Analyze-Plan-Execute iteration'''
+        self.strategy.monitor(**self.monitor_kwargs)
+        self.analyze_plan_execute()
+
+    def analyze_plan_execute(self):
+        strategy = self.strategy
+        instrumentation = strategy.instrumentation
+        with instrumentation.timer("analyze"):
+            analyzed = strategy.analyze()
+        if analyzed:
+            strategy.log_knowledge("analysis")
+            with instrumentation.timer("plan"):
+                planned = strategy.plan()
+            if planned:
+                strategy.log_knowledge("plan")
+                if not strategy.knowledge.plan_data:
+                    print("MAPE-K Loop: No adaptation")
+                elif self.execute:
+                    strategy.execute()
+                    self.executions += 1
+
+    def run(self):
+        '''Runs iterations until the loop ends; returns the number of iterations performed'''
+        self._stopped = False
+        started = next_start = self.clock()
+        while not self._stopped:
+            self.iterate()
+            self.iterations += 1
+            if self._is_done():
+                break
+            period = self.polling_policy.next_period(self.strategy) if self.polling_policy else self.period
+            next_start = self._schedule(next_start + period, period)
+            if self.max_duration is not None and next_start - started > self.max_duration:
+                break
+            self._wait_until(next_start, period)
+        return self.iterations
+
+    def _wait_until(self, next_start, period):
+        self.sleep(max(0.0, next_start - self.clock()))
+
+    def _is_done(self):
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            return True
+        return bool(self.stop_condition and self.stop_condition(self.strategy))
+
+    def _schedule(self, next_start, period):
+        lateness = self.clock() - next_start
+        if lateness > 0 and period > 0:
+            self.overruns += 1
+            skipped = int(lateness // period)
+            if skipped:
+                self.skipped_periods += skipped
+                next_start += skipped * period
+            logging.warning(f"MAPE-K iteration {self.iterations} overran its period by {lateness:.3f}s")
+        return next_start
+
+
+class AdaptivePollingPolicy:
+    """
+    Chooses the period of the next MAPE-K iteration from the last values monitored for `keys`.
+    The system is considered volatile when a value changed by more than `change_threshold` (relative to the
+    previous value) or lies within `margin` (relative) of one of its `thresholds`. The period is then divided
+    by `speedup`; otherwise it is multiplied by `slowdown`. It always stays within [min_period, max_period].
+    `thresholds` maps keys to threshold values, or to a callable returning them when they change at runtime.
+    Every chosen period is recorded in `intervals`.
+    """
+
+    def __init__(self, keys, min_period, max_period, initial_period=None, change_threshold=0.1, thresholds=None,
+                 margin=0.1, speedup=2.0, slowdown=1.25):
+        if not 0 < min_period <= max_period:
+            raise ValueError("periods must satisfy 0 < min_period <= max_period")
+        self.keys = keys
+        self.min_period = min_period
+        self.max_period = max_period
+        self.period = max_period if initial_period is None else initial_period
+        self.change_threshold = change_threshold
+        self.thresholds = thresholds or {}
+        self.margin = margin
+        self.speedup = speedup
+        self.slowdown = slowdown
+        self.intervals = []
+
+    def next_period(self, strategy):
+        period = self.period / self.speedup if self.is_volatile(strategy) else self.period * self.slowdown
+        self.period = min(self.max_period, max(self.min_period, period))
+        self.intervals.append(self.period)
+        return self.period
+
+    def is_volatile(self, strategy):
+        data = strategy.knowledge.monitored_data
+        for key in self.keys:
+            values = data.get(key, [])
+            if len(values) == 0:
+                continue
+            current = values[-1]
+            if len(values) > 1 and abs(current - values[-2]) > self.change_threshold * max(abs(values[-2]), 1e-9):
+                return True
+            thresholds = self.thresholds.get(key, ())
+            for threshold in (thresholds() if callable(thresholds) else thresholds):
+                if abs(current - threshold) <= self.margin * max(abs(threshold), 1e-9):
+                    return True
+        return False
+
+    def save_intervals(self, path):
+        '''Writes the chosen periods to `path`, one per line'''
+        with open(path, "w") as file:
+            file.writelines(f"{interval}\n" for interval in self.intervals)
+
+
+class PipelinedMAPEKLoop(MAPEKLoop):
+    """
+    MAPEKLoop that fetches the sample of iteration t+1 on a background thread, hiding the monitor round trip.
+    Without a period (period=0 and no polling_policy) the request is sent while iteration t is analyzed, planned
+    and executed. Otherwise it is sent while waiting for the next iteration, `fetch_latency` (the smoothed
+    duration of the last monitor requests) before it starts, so the sample is as recent as a direct fetch.
+    Ordering: samples are stored in Knowledge on the loop thread, one per iteration and in the order they were
+    requested, so analyze() and plan() of iteration t never see sample t+1.
+    Staleness: a prefetched sample is dropped and fetched again if an adaptation was executed after it was
+    requested (it may predate the adaptation, unless `keep_after_execute`), or if it was requested more than
+    `max_staleness` seconds (by default, the period) before the iteration that uses it starts. There is never
+    more than one monitor request in flight, and none is left behind when the loop ends. Errors of a prefetch are
+    raised by the iteration that uses its sample.
+    """
+
+    def __init__(self, strategy, period=0.0, max_staleness=None, keep_after_execute=False, **kwargs):
+        super().__init__(strategy, period, **kwargs)
+        self.max_staleness = max_staleness
+        self.keep_after_execute = keep_after_execute
+        self.prefetched = 0
+        self.discarded = 0
+        self.fetch_latency = 0.0
+        self._executor = None
+        self._prefetch = None
+        self._period = period
+
+    def run(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="monitor-prefetch")
+        try:
+            return super().run()
+        finally:
+            if self._prefetch is not None:
+                # Ended by a stop condition: cancel the request in flight, or wait for it to complete
+                future = self._prefetch[0]
+                self._prefetch = None
+                if not future.cancel():
+                    future.exception()
+            self._executor.shutdown(wait=True)
+
+    def iterate(self):
+        # "monitor" is the time the loop waited for its sample, which prefetching hides
+        with self.strategy.instrumentation.timer("monitor"):
+            fresh_data = self._take_prefetched()
+            if fresh_data is None:
+                fresh_data = self._fetch()
+            self.strategy.ingest_monitored_data(fresh_data, **self._ingest_kwargs())
+        if self.polling_policy is None and self.period <= 0 and self._has_next(self.iterations + 1):
+            self._submit_prefetch()
+        self.analyze_plan_execute()
+
+    def _wait_until(self, next_start, period):
+        self._period = period
+        if self._prefetch is None and self._has_next(self.iterations):
+            self.sleep(max(0.0, next_start - self.fetch_latency - self.clock()))
+            self._submit_prefetch()
+        super()._wait_until(next_start, period)
+
+    def _has_next(self, iterations):
+        return self.max_iterations is None or iterations < self.max_iterations
+
+    def _submit_prefetch(self):
+        self._prefetch = (self._executor.submit(self._fetch), self.clock(), self.executions)
+
+    def _take_prefetched(self):
+        if self._prefetch is None:
+            return None
+        future, requested_at, executions = self._prefetch
+        self._prefetch = None
+        if executions != self.executions and not self.keep_after_execute:
+            # Wait for it anyway, so that at most one monitor request is in flight
+            future.exception()
+            self.discarded += 1
+            return None
+        fresh_data = future.result()
+        max_staleness = self.max_staleness if self.max_staleness is not None else self._period or None
+        if max_staleness is not None and self.clock() - requested_at > max_staleness:
+            self.discarded += 1
+            return None
+        self.prefetched += 1
+        return fresh_data
+
+    def _fetch(self):
+        started = self.clock()
+        fresh_data = self.strategy._perform_get_request(self.monitor_kwargs.get("endpoint_suffix", "monitor"))
+        self.fetch_latency = 0.5 * self.fetch_latency + 0.5 * (self.clock() - started)
+        return fresh_data
+
+    def _ingest_kwargs(self):
+        return {key: value for key, value in self.monitor_kwargs.items() if key != "endpoint_suffix"}
@@ -0,0 +1,167 @@
+from dataclasses import dataclass
+from pathlib import Path
+from queue import Queue, Empty
+import csv
+import itertools
+import logging
+import threading
+import time
+
+from UPISAS.container_resources import ContainerResources, available_cores, format_cpuset, pin_current_process
+
+
+@dataclass
+class RunContext:
+    """
+    Context handed to the hooks of a run, with the attributes of Experiment Runner's RunnerContext.
+    """
+    run_variation: dict
+    run_nr: int
+    run_dir: Path
+
+
+def run_table_from_factors(factors, repetitions=1):
+    '''Full factorial run table (a list of rows) from a {factor name: levels} dict, like Experiment Runner's'''
+    names = list(factors)
+    rows = []
+    for index, levels in enumerate(itertools.product(*(factors[name] for name in names))):
+        for repetition in range(repetitions):
+            row = {"__run_id": f"run_{index}_repetition_{repetition}"}
+            row.update(zip(names, levels))
+            rows.append(row)
+    return rows
+
+
+def parallel_slots(runs, cpu_budget=None, cpus_per_run=None, cores=None):
+    '''Number of runs ParallelRunExecutor executes concurrently, i.e. the size of the fleet it needs'''
+    if not cpus_per_run:
+        return max(1, runs)
+    cores = available_cores() if cores is None else cores
+    budget = min(cpu_budget or len(cores), len(cores))
+    return max(1, min(runs, budget // cpus_per_run))
+
+
+class ParallelRunExecutor:
+    """
+    Executes the independent rows of a run table concurrently, one per instance of an ExemplarFleet.
+    Every slot (fleet instance) gets its own config from `config_factory()`: an Experiment Runner RunnerConfig
+    or any object with its run hooks (before_run, start_run, start_measurement, interact, stop_measurement,
+    stop_run, populate_run_data). The config's `exemplar` is set to the slot's warm instance, so before_run
+    reuses it, and stop_run resets it between runs. A restart alone does not clean the state of an exemplar: give
+    a `reset_hook(exemplar)` or the `snapshot_paths` to restore (see Exemplar.enable_warm_pool), e.g.
+    reset_hook=Exemplar.recreate_container for a new container per run.
+    Results are isolated per run in `results_dir/<run id>/` and gathered in `results_dir/run_table.csv`.
+    CPU budget: at most `cpu_budget // cpus_per_run` runs are in flight, and with `cpus_per_run` every slot's
+    container is pinned to its own set of the cores available to this process (`cores`, by default its CPU
+    affinity), so concurrent runs don't compete for CPU. Size the fleet with parallel_slots(): instances beyond
+    the slots are left unused. With `pin_process`, the UPISAS process is pinned to the cores left, if any, so it
+    does not compete with the containers either.
+    """
+
+    HOOKS = ("before_run", "start_run", "start_measurement", "interact", "stop_measurement", "stop_run")
+
+    def __init__(self, config_factory, fleet, results_dir, cpu_budget=None, cpus_per_run=None, pin_process=False,
+                 cores=None, reset_hook=None, snapshot_paths=None):
+        self.config_factory = config_factory
+        self.fleet = fleet
+        self.results_dir = Path(results_dir)
+        self.cores = list(cores) if cores is not None else available_cores()
+        self.cpu_budget = cpu_budget or len(self.cores)
+        self.cpus_per_run = cpus_per_run
+        self.pin_process = pin_process
+        self.reset_hook = reset_hook
+        self.snapshot_paths = snapshot_paths
+        self.results = {}
+        self._lock = threading.Lock()
+
+    @property
+    def slots(self):
+        '''Number of runs executed concurrently'''
+        return parallel_slots(len(self.fleet), self.cpu_budget, self.cpus_per_run, self.cores)
+
+    def cpuset(self, slot):
+        '''Cores of a slot, e.g. "4-7" for the second slot with 4 cpus_per_run and cores 0-7 available'''
+        return format_cpuset(self.cores[slot * self.cpus_per_run:(slot + 1) * self.cpus_per_run])
+
+    def run(self, run_table):
+        '''Executes every row of `run_table`; returns the run data per run id, in run table order'''
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        rows = Queue()
+        for run_nr, row in enumerate(run_table):
+            rows.put((run_nr, dict(row, __run_id=row.get("__run_id", f"run_{run_nr}"))))
+        self.results = {}
+        if self.pin_process and self.cpus_per_run:
+            free_cores = self.cores[self.slots * self.cpus_per_run:]
+            if free_cores:
+                pin_current_process(format_cpuset(free_cores))
+        started = time.monotonic()
+        workers = [threading.Thread(target=self._work, args=(slot, rows), name=f"parallel-run-{slot}")
+                   for slot in range(self.slots)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        logging.info(f"{len(self.results)} runs on {self.slots} slots in {time.monotonic() - started:.1f}s")
+        results = [self.results[run_nr] for run_nr in sorted(self.results)]
+        self._write_run_table(results)
+        return {row["__run_id"]: row for row in results}
+
+    def _work(self, slot, rows):
+        exemplar = self.fleet[slot]
+        if not exemplar.warm_pool:
+            exemplar.enable_warm_pool(self.reset_hook, self.snapshot_paths)
+        if self.cpus_per_run:
+            exemplar.apply_resources(ContainerResources(cpuset_cpus=self.cpuset(slot)))
+        config = self.config_factory()
+        config.exemplar = exemplar
+        cooldown = getattr(config, "time_between_runs_in_ms", 0) / 1000
+        first = True
+        while True:
+            try:
+                run_nr, row = rows.get_nowait()
+            except Empty:
+                return
+            if not first:
+                time.sleep(cooldown)
+            first = False
+            result = self._execute_run(config, run_nr, row)
+            with self._lock:
+                self.results[run_nr] = result
+
+    def _execute_run(self, config, run_nr, row):
+        run_dir = self.results_dir / row["__run_id"]
+        run_dir.mkdir(parents=True, exist_ok=True)
+        context = RunContext(row, run_nr, run_dir)
+        result = dict(row)
+        try:
+            for hook in self.HOOKS:
+                method = getattr(config, hook, None)
+                if method is None:
+                    continue
+                if hook == "before_run":
+                    method()  # No context is available before the run, as in Experiment Runner
+                else:
+                    method(context)
+            if hasattr(config, "populate_run_data"):
+                result.update(config.populate_run_data(context) or {})
+            result["__done"] = "DONE"
+        except Exception as e:
+            logging.error(f"{row['__run_id']} failed: {e!r}")
+            result["__done"] = "FAILED"
+            # stop_run may not have reset the instance, leave it clean for the next run of the slot
+            try:
+                config.exemplar.reset()
+            except Exception as reset_error:
+                logging.error(f"cannot reset the instance after {row['__run_id']}: {reset_error!r}")
+        return result
+
+    def _write_run_table(self, results):
+        fieldnames = []
+        for row in results:
+            for key in row:
+                if key not in fieldnames:
+                    fieldnames.append(key)
+        with open(self.results_dir / "run_table.csv", "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(results)
@@ -0,0 +1,153 @@
+from collections.abc import MutableMapping
+from pathlib import Path
+import json
+
+import numpy as np
+
+
+def _infer_dtype(value):
+    if isinstance(value, (bool, np.bool_)):
+        return np.bool_
+    if isinstance(value, (int, np.integer)):
+        return np.int64
+    if isinstance(value, (float, np.floating)):
+        return np.float64
+    return object
+
+
+def _fits(dtype, value):
+    if dtype.kind == "O":
+        return True
+    if isinstance(value, (bool, np.bool_)):
+        return dtype.kind == "b"
+    if dtype.kind == "i":
+        return isinstance(value, (int, np.integer))
+    if dtype.kind == "f":
+        return isinstance(value, (int, float, np.integer, np.floating))
+    return False
+
+
+class RingBuffer:
+    """
+    Fixed-capacity buffer holding the last `capacity` values of one monitored key in a typed NumPy array.
+    Each value is written twice, at i and i + capacity, so the stored values are always contiguous and
+    view()/last(n) return NumPy views without copying. The dtype is inferred from the first value
+    (int, float, bool or object) and widened if a later value does not fit.
+    Values evicted once the buffer is full are appended as JSON lines to `spill_path`, if given.
+    """
+
+    def __init__(self, capacity, dtype=None, spill_path=None):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.evicted = 0
+        self._data = None if dtype is None else np.empty(2 * capacity, dtype=dtype)
+        self._start = 0
+        self._length = 0
+        self._spill_file = None
+
+    @property
+    def dtype(self):
+        return None if self._data is None else self._data.dtype
+
+    def append(self, value):
+        if self._data is None:
+            self._data = np.empty(2 * self.capacity, dtype=_infer_dtype(value))
+        elif not _fits(self._data.dtype, value):
+            self._widen(value)
+        if self._length == self.capacity:
+            if self.spill_path is not None:
+                self._spill(self._data[self._start])
+            self._start = (self._start + 1) % self.capacity
+            self.evicted += 1
+        else:
+            self._length += 1
+        end = (self._start + self._length - 1) % self.capacity
+        self._data[end] = value
+        self._data[end + self.capacity] = value
+
+    def view(self):
+        '''All stored values, oldest first, as a read-only view'''
+        if self._data is None:
+            return np.empty(0)
+        view = self._data[self._start:self._start + self._length]
+        view.flags.writeable = False
+        return view
+
+    def last(self, n):
+        '''The last n stored values (at most capacity), as a read-only view'''
+        return self.view()[max(0, self._length - n):]
+
+    def tolist(self):
+        return self.view().tolist()
+
+    def close(self):
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _widen(self, value):
+        dtype = np.float64 if self._data.dtype.kind == "i" and _infer_dtype(value) is np.float64 else object
+        self._data = self._data.astype(dtype)
+
+    def _spill(self, value):
+        if self._spill_file is None:
+            self._spill_file = open(self.spill_path, "a")
+        self._spill_file.write(json.dumps(value.item() if isinstance(value, np.generic) else value, default=str) + "\n")
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return self.view()[index]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    def __repr__(self):
+        return f"RingBuffer(capacity={self.capacity}, values={self.tolist()})"
+
+
+class RingBufferStore(MutableMapping):
+    """
+    Drop-in replacement for the dict in Knowledge.monitored_data that keeps one RingBuffer per monitored key,
+    so memory stays constant over long runs. Assigning a list to a key creates its buffer from the list.
+    `dtypes` optionally fixes the dtype per key; with `spill_dir`, evicted values go to <spill_dir>/<key>.jsonl.
+    """
+
+    def __init__(self, capacity, dtypes=None, spill_dir=None):
+        self.capacity = capacity
+        self.dtypes = dtypes or {}
+        self.spill_dir = Path(spill_dir) if spill_dir is not None else None
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+        self._buffers = {}
+
+    def __getitem__(self, key):
+        return self._buffers[key]
+
+    def __setitem__(self, key, values):
+        spill_path = self.spill_dir / f"{key}.jsonl" if self.spill_dir is not None else None
+        buffer = RingBuffer(self.capacity, self.dtypes.get(key), spill_path)
+        for value in values:
+            buffer.append(value)
+        if key in self._buffers:
+            self._buffers[key].close()
+        self._buffers[key] = buffer
+
+    def __delitem__(self, key):
+        self._buffers.pop(key).close()
+
+    def __iter__(self):
+        return iter(self._buffers)
+
+    def __len__(self):
+        return len(self._buffers)
+
+    def close(self):
+        for buffer in self._buffers.values():
+            buffer.close()
+
+    def __repr__(self):
+        return f"RingBufferStore({ {key: buffer.tolist() for key, buffer in self._buffers.items()} })"
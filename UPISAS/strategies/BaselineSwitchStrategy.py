@@ -2,7 +2,6 @@ import os
 import time
 import pandas as pd
 from UPISAS.strategy import Strategy
-import UPISAS.exemplars.switch_interface as switch
 
 # Global thresholds for analysis
 THRESHOLDS = {
@@ -27,8 +26,11 @@ class SwitchStrategy(Strategy):
 
     def analyze(self):
         print("Analyzing")
-        # Get monitoring data
-        data = switch.get_monitor_data()
+        # Use the sample stored by monitor() instead of fetching a new one
+        data = self.get_latest_monitored_data()
+        if not data:
+            print("No monitored data available, call monitor() before analyze()")
+            return False
         input_rate = data["input_rate"]
         cpu_utilization = data["cpu"]
         confidence = data["confidence"]
@@ -2,9 +2,11 @@ import time
 
 from optuna.samplers import RandomSampler
 
-from UPISAS.strategies.helpers.predict import predict_future_metrics
+from UPISAS.strategies.helpers.forecasting import ForecastingEngine
+from UPISAS.strategies.helpers.predict import PREDICTED_METRICS
+from UPISAS.strategies.helpers.threshold_tuning import MetricHistory, ThresholdTuner, evaluate_thresholds, \
+    open_threshold_study, tune_thresholds
 from UPISAS.strategy import Strategy
-import UPISAS.exemplars.switch_interface as switch
 import optuna
 
 
@@ -16,13 +18,18 @@ def model_to_option(model):
     return model_map.get(model, -1)
 
 class SwitchStrategy(Strategy):
-    def __init__(self, exemplar):
+    def __init__(self, exemplar, snapshot_path=None, restore_knowledge=True, tuning_candidates=200,
+                 background_tuning=True):
         super().__init__(exemplar)
         self.predict = True
         self.count = 0
         self.time = -1  # For tracking when thresholds are violated
         self.adaptation_needed = None
-        self.metric_history = []
+        self.metric_history = MetricHistory()
+        self.workload = None  # Workload of the metric history, once a study is attached
+        self.tuning_candidates = tuning_candidates  # Threshold vectors evaluated, in one batch, per tuning step
+        # Forecasts 10 samples ahead with whichever model has recently been most accurate for each metric
+        self.forecasting_engine = ForecastingEngine(PREDICTED_METRICS, horizon=10, window=20)
         self.thresholds = {
             "cpu_utilization_upper": 80,
             "cpu_utilization_lower": 20,
@@ -30,11 +37,68 @@ class SwitchStrategy(Strategy):
             "processing_time_upper": 2
         }
         self.study = optuna.create_study(direction="maximize",sampler=RandomSampler())  # Random Sampler for increased exploration
+        # Tunes the thresholds off the control loop; published thresholds are picked up at the next iteration
+        self.tuner = ThresholdTuner(self.study, tuning_candidates, instrumentation=self.instrumentation) \
+            if background_tuning else None
+        self.thresholds_version = 0
+        if snapshot_path:
+            # Warm start from the learned thresholds, history and trials of a previous run
+            self.restore_snapshot(snapshot_path, knowledge=restore_knowledge)
+
+    def stop_tuning(self):
+        '''Stops the background tuner, after it has published the tuning in progress'''
+        if self.tuner:
+            self.tuner.stop()
+
+    def attach_study(self, journal_path, workload, n_startup_trials=50):
+        '''Moves threshold tuning, before the loop starts, to the persistent study of `workload` in a journal file'''
+        study = open_threshold_study(journal_path, workload, n_startup_trials)
+        same_workload = self.workload in (None, workload)
+        if not same_workload:
+            # The history and trials restored from a snapshot were measured under another workload
+            self.metric_history = MetricHistory()
+            self.forecasting_engine = ForecastingEngine(PREDICTED_METRICS, horizon=10, window=20)
+        # Trials left running by an interrupted tuning have no value: only the completed ones count
+        if study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)):
+            # Resume from the runs that tuned this workload before
+            self.thresholds = study.best_params
+        elif same_workload:
+            # Carry over the trials restored from a snapshot, if any
+            study.add_trials(self.get_state()["trials"])
+        self.workload = workload
+        self.study = study
+        if self.tuner:
+            self.tuner.study = study
+        return study
+
+    def get_state(self):
+        return {
+            "count": self.count,
+            "metric_history": self.metric_history.to_records(),
+            "thresholds": self.thresholds,
+            "workload": self.workload,
+            "trials": [trial for trial in self.study.trials if trial.state == optuna.trial.TrialState.COMPLETE]
+        }
+
+    def set_state(self, state):
+        self.count = state["count"]
+        self.metric_history = MetricHistory.from_records(state["metric_history"])
+        self.forecasting_engine = ForecastingEngine(PREDICTED_METRICS, horizon=10, window=20)
+        for record in self.metric_history:
+            self.forecasting_engine.update(record)
+        self.thresholds = state["thresholds"]
+        self.workload = state.get("workload")
+        if not self.study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,)):
+            # A persistent study already holds its trials
+            self.study.add_trials(state["trials"])
 
     def analyze(self):
         print("Analyzing")
-        # Get monitoring data
-        data = switch.get_monitor_data()
+        # Use the sample stored by monitor() instead of fetching a new one
+        data = self.get_latest_monitored_data()
+        if not data:
+            print("No monitored data available, call monitor() before analyze()")
+            return False
         input_rate = data["input_rate"]
         cpu_utilization = data["cpu"]
         confidence = data["confidence"]
@@ -54,10 +118,12 @@ class SwitchStrategy(Strategy):
             "model_processing_time": model_processing_time,
             "utility": utility
         })
+        with self.instrumentation.timer("analyze.predict"):
+            self.forecasting_engine.update(self.metric_history[-1])
+            # Once a full window has been seen, predict metrics for 10 seconds from now at every iteration
+            predicted_metrics = self.forecasting_engine.predict() if self.forecasting_engine.ready else None
 
-        # Once we have 20 entries, predict metrics for 10 seconds from now
-        if self.predict == True and len(self.metric_history) == 20:
-            predicted_metrics = predict_future_metrics(self.metric_history, horizon=10)
+        if self.predict == True and predicted_metrics:
             cpu_utilization = predicted_metrics["cpu"]
             confidence = predicted_metrics["confidence"]
             image_processing_time = predicted_metrics["image_processing_time"]
@@ -66,11 +132,21 @@ class SwitchStrategy(Strategy):
         # Increment the counter
         self.count += 1
 
+        # Use the thresholds published by the background tuner since the last iteration, if any
+        if self.tuner:
+            version, thresholds = self.tuner.published
+            if version != self.thresholds_version:
+                self.thresholds_version, self.thresholds = version, thresholds
+                print(f"Updated thresholds: {self.thresholds}")
+
         # Optimize thresholds every 10 iterations
         if self.count % 10 == 0 and len(self.metric_history) > 0:
-            self.study.optimize(self.optimize_tresholds, n_trials=5)
-            self.thresholds = self.study.best_params
-            print(f"Updated thresholds: {self.thresholds}")
+            if self.tuner:
+                self.tuner.submit(self.metric_history.snapshot())
+            else:
+                with self.instrumentation.timer("analyze.optimize_thresholds"):
+                    self.thresholds = tune_thresholds(self.study, self.metric_history, self.tuning_candidates)
+                print(f"Updated thresholds: {self.thresholds}")
 
         # Check thresholds
         current_time = time.time()
@@ -152,12 +228,6 @@ class SwitchStrategy(Strategy):
         confidence_lower = trial.suggest_float("confidence_lower", 0.3, 0.95)
         processing_time_upper = trial.suggest_float("processing_time_upper", 1, 5)
 
-        # Evaluate utility using all historical data
-        total_utility = 0
-        for record in self.metric_history:  # Use all historical data
-            if (record["cpu"] <= cpu_upper and record["cpu"] >= cpu_lower and
-                record["confidence"] >= confidence_lower and
-                record["image_processing_time"] <= processing_time_upper):
-                total_utility += record["utility"] * (record["confidence"] ** 2)
-
-        return total_utility
\ No newline at end of file
+        # Mean utility per record of the whole history, comparable across runs of any length
+        candidate = [cpu_upper, cpu_lower, confidence_lower, processing_time_upper]
+        return float(evaluate_thresholds(self.metric_history, candidate)[0])
\ No newline at end of file
@@ -1,6 +1,5 @@
 from UPISAS.strategies.helpers.predict import predict_future_metrics
 from UPISAS.strategy import Strategy
-import UPISAS.exemplars.switch_interface as switch
 import optuna
 
 # Global thresholds for analysis
@@ -51,8 +50,11 @@ class SwitchStrategy(Strategy):
 
     def analyze(self):
         print("Analyzing")
-        # Get monitoring data
-        data = switch.get_monitor_data()
+        # Use the sample stored by monitor() instead of fetching a new one
+        data = self.get_latest_monitored_data()
+        if not data:
+            print("No monitored data available, call monitor() before analyze()")
+            return False
         input_rate = data["input_rate"]
         cpu_utilization = data["cpu"]
         confidence = data["confidence"]
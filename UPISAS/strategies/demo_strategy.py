@@ -1,12 +1,17 @@
 from UPISAS.strategy import Strategy
+from UPISAS.aggregates import RunningMean
 
 
 class DemoStrategy(Strategy):
 
+    def __init__(self, exemplar):
+        super().__init__(exemplar)
+        self.subscribe_aggregate("f", "mean", RunningMean())
+
     def analyze(self):
         data = self.knowledge.monitored_data
         print(data)
-        mean_f = sum(data["f"])/len(data["f"])
+        mean_f = self.knowledge.aggregates["f"]["mean"].value
         print("[Analysis]\tmean_f: " + str(mean_f))
         if mean_f > 0:
             self.knowledge.analysis_data["mean_f"] = mean_f
@@ -0,0 +1,203 @@
+from abc import ABC, abstractmethod
+from collections import deque
+
+import numpy as np
+
+
+class Forecaster(ABC):
+    """
+    Online forecaster of several metrics at once, with one entry per metric in every NumPy array.
+    observe() scores the forecast made `horizon` samples earlier against the new values, then update()s the model,
+    so `error` is the mean absolute error of the model's own `horizon`-ahead forecasts over the last
+    `error_window` samples. Subclasses implement update() and predict(), in O(1) or O(p) per sample.
+    """
+
+    def __init__(self, size, horizon=1, error_window=20):
+        self.size = size
+        self.horizon = horizon
+        self.count = 0
+        self._forecasts = deque(maxlen=horizon)
+        self._errors = deque(maxlen=error_window)
+        self._error_sum = np.zeros(size)
+
+    def observe(self, values):
+        if len(self._forecasts) == self.horizon:
+            error = np.abs(self._forecasts[0] - values)
+            if len(self._errors) == self._errors.maxlen:
+                self._error_sum -= self._errors[0]
+            self._errors.append(error)
+            self._error_sum += error
+        self.update(values)
+        self.count += 1
+        self._forecasts.append(self.predict(self.horizon))
+
+    @property
+    def error(self):
+        '''Mean absolute error per metric of the recent forecasts (infinite before the first is scored)'''
+        return self._error_sum / len(self._errors) if self._errors else np.full(self.size, np.inf)
+
+    @abstractmethod
+    def update(self, values):
+        pass
+
+    @abstractmethod
+    def predict(self, horizon):
+        pass
+
+
+class LinearTrend(Forecaster):
+    '''Least-squares linear trend over the last `window` samples (all samples if None), from running sums'''
+
+    def __init__(self, size, window=20, **kwargs):
+        super().__init__(size, **kwargs)
+        self.values = deque(maxlen=window)
+        self.sum_y = np.zeros(size)
+        self.sum_xy = np.zeros(size)  # x = 0 for the oldest sample of the window
+
+    def update(self, values):
+        if len(self.values) == self.values.maxlen:
+            self.sum_y -= self.values.popleft()
+            # The oldest sample leaves at x = 0, the others move one step closer to it
+            self.sum_xy -= self.sum_y
+        self.sum_xy += len(self.values) * values
+        self.sum_y += values
+        self.values.append(values)
+
+    def predict(self, horizon):
+        n = len(self.values)
+        if n == 0:
+            return np.zeros(self.size)
+        sum_x = n * (n - 1) / 2
+        sum_xx = (n - 1) * n * (2 * n - 1) / 6
+        denominator = n * sum_xx - sum_x ** 2
+        slope = (n * self.sum_xy - sum_x * self.sum_y) / denominator if denominator else np.zeros(self.size)
+        intercept = (self.sum_y - slope * sum_x) / n
+        return intercept + slope * (n - 1 + horizon)
+
+
+class EWMA(Forecaster):
+    '''Exponentially weighted moving average with smoothing factor `alpha`, forecast flat'''
+
+    def __init__(self, size, alpha=0.5, **kwargs):
+        super().__init__(size, **kwargs)
+        self.alpha = alpha
+        self.level = None
+
+    def update(self, values):
+        self.level = values.copy() if self.level is None else self.alpha * values + (1 - self.alpha) * self.level
+
+    def predict(self, horizon):
+        return self.level if self.level is not None else np.zeros(self.size)
+
+
+class Holt(Forecaster):
+    '''Holt's double exponential smoothing: level (smoothing `alpha`) plus trend (smoothing `beta`)'''
+
+    def __init__(self, size, alpha=0.5, beta=0.3, **kwargs):
+        super().__init__(size, **kwargs)
+        self.alpha = alpha
+        self.beta = beta
+        self.level = None
+        self.trend = np.zeros(size)
+
+    def update(self, values):
+        if self.level is None:
+            self.level = values.copy()
+            return
+        level = self.alpha * values + (1 - self.alpha) * (self.level + self.trend)
+        self.trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+        self.level = level
+
+    def predict(self, horizon):
+        if self.level is None:
+            return np.zeros(self.size)
+        return self.level + horizon * self.trend
+
+
+class AutoRegressive(Forecaster):
+    """
+    AR(p) model of the deviations from an exponentially weighted mean (smoothing `alpha`), with coefficients
+    learned online by normalised least mean squares (step `step`). Forecasts more than one step ahead are
+    made recursively.
+    """
+
+    def __init__(self, size, p=3, step=0.5, alpha=0.1, **kwargs):
+        super().__init__(size, **kwargs)
+        self.p = p
+        self.step = step
+        self.alpha = alpha
+        self.mean = None
+        self.weights = np.zeros((size, p))
+        self.lags = np.zeros((size, p))  # Most recent deviation first
+
+    def update(self, values):
+        if self.mean is None:
+            self.mean = values.copy()
+        deviation = values - self.mean
+        error = deviation - np.sum(self.weights * self.lags, axis=1)
+        norm = np.sum(self.lags * self.lags, axis=1) + 1e-9
+        self.weights += (self.step * error / norm)[:, None] * self.lags
+        self.lags = np.roll(self.lags, 1, axis=1)
+        self.lags[:, 0] = deviation
+        self.mean = self.alpha * values + (1 - self.alpha) * self.mean
+
+    def predict(self, horizon):
+        if self.mean is None:
+            return np.zeros(self.size)
+        lags = self.lags.copy()
+        for _ in range(horizon):
+            deviation = np.sum(self.weights * lags, axis=1)
+            lags = np.roll(lags, 1, axis=1)
+            lags[:, 0] = deviation
+        return self.mean + lags[:, 0]
+
+
+class ForecastingEngine:
+    """
+    Runs several Forecasters side by side on the same metrics and forecasts every metric with the model whose
+    recent `horizon`-ahead error on that metric (over the last `window` samples) is the lowest. Memory and time per sample do not grow with the
+    length of the run: models only keep a sliding `window` of samples or constant-size state.
+    """
+
+    def __init__(self, metrics, horizon=10, window=20, models=None):
+        self.metrics = tuple(metrics)
+        self.horizon = horizon
+        self.window = window
+        size = len(self.metrics)
+        self.models = models or {
+            "linear_trend": LinearTrend(size, window, horizon=horizon, error_window=window),
+            "ewma": EWMA(size, 0.5, horizon=horizon, error_window=window),
+            "holt": Holt(size, 0.5, 0.3, horizon=horizon, error_window=window),
+            "ar3": AutoRegressive(size, 3, horizon=horizon, error_window=window),
+        }
+        self.count = 0
+
+    def update(self, record):
+        '''Feeds one sample, a dict with a value for every metric, to every model'''
+        values = np.fromiter((record[metric] for metric in self.metrics), dtype=float, count=len(self.metrics))
+        for model in self.models.values():
+            model.observe(values)
+        self.count += 1
+
+    @property
+    def ready(self):
+        '''True once a full window of samples has been seen'''
+        return self.count >= self.window
+
+    def errors(self):
+        '''Recent forecast error of every model, as {model: {metric: error}}'''
+        return {name: dict(zip(self.metrics, model.error.tolist())) for name, model in self.models.items()}
+
+    def best_models(self):
+        '''Name of the most accurate model per metric'''
+        names = list(self.models)
+        errors = np.array([self.models[name].error for name in names])
+        return {metric: names[index] for metric, index in zip(self.metrics, np.argmin(errors, axis=0))}
+
+    def predict(self, horizon=None):
+        '''Forecast of every metric `horizon` samples ahead, each by its most accurate model'''
+        horizon = self.horizon if horizon is None else horizon
+        best = self.best_models()
+        forecasts = {name: model.predict(horizon) for name, model in self.models.items()
+                     if name in best.values()}
+        return {metric: float(forecasts[best[metric]][index]) for index, metric in enumerate(self.metrics)}
@@ -1,5 +1,50 @@
 import numpy as np
-from sklearn.linear_model import LinearRegression
+
+PREDICTED_METRICS = ("cpu", "confidence", "image_processing_time", "model_processing_time")
+
+
+class TrendForecaster:
+    """
+    Streaming least-squares linear trend of several metrics at once.
+    Sample i of every metric is fitted at x = i, as LinearRegression over range(len(history)) would, but from
+    running sums kept in NumPy arrays (one entry per metric): update() and predict() take constant time,
+    whatever the length of the history.
+    """
+
+    def __init__(self, metrics=PREDICTED_METRICS):
+        self.metrics = tuple(metrics)
+        self.count = 0
+        self.sum_x = 0.0
+        self.sum_xx = 0.0
+        self.sum_y = np.zeros(len(self.metrics))
+        self.sum_xy = np.zeros(len(self.metrics))
+
+    def update(self, record):
+        '''Adds one sample, a dict with a value for every metric'''
+        y = np.fromiter((record[metric] for metric in self.metrics), dtype=float, count=len(self.metrics))
+        x = float(self.count)
+        self.count += 1
+        self.sum_x += x
+        self.sum_xx += x * x
+        self.sum_y += y
+        self.sum_xy += x * y
+
+    def coefficients(self):
+        '''Slope and intercept of the trend of every metric, as two arrays'''
+        denominator = self.count * self.sum_xx - self.sum_x ** 2
+        if denominator == 0:
+            slope = np.zeros(len(self.metrics))
+        else:
+            slope = (self.count * self.sum_xy - self.sum_x * self.sum_y) / denominator
+        intercept = (self.sum_y - slope * self.sum_x) / max(self.count, 1)
+        return slope, intercept
+
+    def predict(self, horizon=10):
+        '''Value of every metric `horizon` samples after the last one, as a {metric: value} dict'''
+        slope, intercept = self.coefficients()
+        predicted = intercept + slope * (self.count + horizon - 1)
+        return dict(zip(self.metrics, predicted.tolist()))
+
 
 def predict_future_metrics(metric_history, horizon=10):
     """
@@ -13,32 +58,9 @@ def predict_future_metrics(metric_history, horizon=10):
         dict: Predicted metrics for 'cpu', 'confidence', 'image_processing_time', and 'model_processing_time'.
     """
     print("predicting values")
-    # Extract the individual metric lists from the history
-    cpu_history = [entry['cpu'] for entry in metric_history]
-    confidence_history = [entry['confidence'] for entry in metric_history]
-    image_processing_time_history = [entry['image_processing_time'] for entry in metric_history]
-    model_processing_time_history = [entry['model_processing_time'] for entry in metric_history]
-
-    # Prepare input data for prediction
-    X = np.array(range(len(metric_history))).reshape(-1, 1)
-    future_X = np.array([[len(metric_history) + horizon - 1]])
-
-    # Function to fit and predict the future value using linear regression
-    def predict_next_value(y_history):
-        model = LinearRegression()
-        model.fit(X, y_history)
-        return model.predict(future_X)[0]
-
-    # Predict future values for each metric
-    predicted_cpu = predict_next_value(cpu_history)
-    predicted_confidence = predict_next_value(confidence_history)
-    predicted_image_processing_time = predict_next_value(image_processing_time_history)
-    predicted_model_processing_time = predict_next_value(model_processing_time_history)
-
-    # Return the predicted metrics
-    return {
-        "cpu": predicted_cpu,
-        "confidence": predicted_confidence,
-        "image_processing_time": predicted_image_processing_time,
-        "model_processing_time": predicted_model_processing_time
-    }
+    # Fit the linear trend of every metric in a single pass; strategies predicting repeatedly should keep a
+    # TrendForecaster up to date instead
+    forecaster = TrendForecaster()
+    for entry in metric_history:
+        forecaster.update(entry)
+    return forecaster.predict(horizon)
@@ -0,0 +1,205 @@
+import logging
+import threading
+from contextlib import nullcontext
+
+import numpy as np
+import optuna
+from optuna.distributions import FloatDistribution
+from optuna.samplers import TPESampler
+from optuna.storages import JournalStorage
+from optuna.storages.journal import JournalFileBackend
+from optuna.trial import create_trial
+
+HISTORY_COLUMNS = ("cpu", "confidence", "image_processing_time", "model_processing_time", "utility")
+
+# Search space of the adaptation thresholds, in the column order of candidate matrices
+THRESHOLD_BOUNDS = {
+    "cpu_utilization_upper": (75, 95),
+    "cpu_utilization_lower": (10, 60),
+    "confidence_lower": (0.3, 0.95),
+    "processing_time_upper": (1, 5),
+}
+THRESHOLD_DISTRIBUTIONS = {name: FloatDistribution(low, high) for name, (low, high) in THRESHOLD_BOUNDS.items()}
+
+
+def open_threshold_study(journal_path, workload, n_startup_trials=50):
+    """
+    Threshold study of `workload` in a local Optuna journal file, created on first use and resumed afterwards;
+    one file can hold the studies of several workloads. Trials are scored on the history of their own workload
+    only (see evaluate_thresholds). The TPE sampler explores randomly until the study holds
+    `n_startup_trials` completed trials, which a resumed study may already have.
+    """
+    storage = JournalStorage(JournalFileBackend(str(journal_path)))
+    return optuna.create_study(study_name=f"thresholds-{workload}", storage=storage, direction="maximize",
+                               sampler=TPESampler(n_startup_trials=n_startup_trials), load_if_exists=True)
+
+
+class MetricHistory:
+    """
+    Metric records held as the rows of a NumPy matrix, one column per HISTORY_COLUMNS entry. The matrix doubles
+    its capacity when full, so append() takes amortised constant time. Iterating or indexing gives back dicts,
+    as the list of records it replaces did.
+    """
+
+    def __init__(self, columns=HISTORY_COLUMNS, capacity=1024):
+        self.columns = tuple(columns)
+        self._data = np.empty((capacity, len(self.columns)))
+        self._length = 0
+
+    @classmethod
+    def from_records(cls, records, columns=HISTORY_COLUMNS):
+        history = cls(columns, capacity=max(len(records), 1024))
+        for record in records:
+            history.append(record)
+        return history
+
+    def append(self, record):
+        if self._length == len(self._data):
+            self._data = np.concatenate([self._data, np.empty_like(self._data)])
+        self._data[self._length] = [record[column] for column in self.columns]
+        self._length += 1
+
+    @property
+    def array(self):
+        '''The records as a (length x columns) matrix view'''
+        return self._data[:self._length]
+
+    def column(self, name):
+        return self.array[:, self.columns.index(name)]
+
+    def snapshot(self):
+        '''The records appended so far, without copying: later appends to either history never reach the other'''
+        snapshot = MetricHistory(self.columns, capacity=0)
+        # Full from the start, so an append reallocates instead of writing into the shared buffer
+        snapshot._data = self._data[:self._length]
+        snapshot._length = self._length
+        return snapshot
+
+    def to_records(self):
+        return [dict(zip(self.columns, row)) for row in self.array.tolist()]
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        return dict(zip(self.columns, self.array[index].tolist()))
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+
+def evaluate_thresholds(history, candidates, chunk_size=4_000_000):
+    """
+    Utility of every candidate threshold vector over the whole history, in one vectorised pass: the mean over
+    the records of utility * confidence^2, counting 0 for the records outside the thresholds. Being a mean, it
+    does not grow with the history, so the values of trials scored on histories of any length compare.
+    `candidates` is a (candidates x 4) matrix in THRESHOLD_BOUNDS order. Candidates are evaluated in chunks of at
+    most `chunk_size` (candidate, record) pairs.
+    """
+    candidates = np.atleast_2d(np.asarray(candidates, dtype=float))
+    cpu, confidence = history.column("cpu"), history.column("confidence")
+    processing_time = history.column("image_processing_time")
+    weights = history.column("utility") * confidence ** 2
+    utilities = np.empty(len(candidates))
+    step = max(1, chunk_size // max(len(history), 1))
+    for start in range(0, len(candidates), step):
+        cpu_upper, cpu_lower, confidence_lower, processing_time_upper = candidates[start:start + step].T[:, :, None]
+        within = ((cpu <= cpu_upper) & (cpu >= cpu_lower) & (confidence >= confidence_lower)
+                  & (processing_time <= processing_time_upper))
+        utilities[start:start + step] = within @ weights
+    return utilities / len(history) if len(history) else utilities
+
+
+def tune_thresholds(study, history, n_candidates=200, n_trials=5, rng=None):
+    """
+    Evaluates `n_candidates` threshold vectors over the history in one batch and returns the best thresholds
+    found by `study` so far. `n_trials` candidates are asked from the sampler of the study and told their utility;
+    the others are drawn uniformly, and only the best `n_trials` of them are added to the study as completed
+    trials, which keeps the per-trial overhead of Optuna and the growth of the study bounded.
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    trials = [study.ask(THRESHOLD_DISTRIBUTIONS) for _ in range(min(n_trials, n_candidates))]
+    low, high = np.array(list(THRESHOLD_BOUNDS.values()), dtype=float).T
+    drawn = rng.uniform(low, high, size=(n_candidates - len(trials), len(THRESHOLD_BOUNDS)))
+    asked = np.array([[trial.params[name] for name in THRESHOLD_BOUNDS] for trial in trials]).reshape(-1, len(low))
+    utilities = evaluate_thresholds(history, np.concatenate([asked, drawn]))
+    for trial, utility in zip(trials, utilities[:len(trials)].tolist()):
+        study.tell(trial, utility)
+    drawn_utilities = utilities[len(trials):]
+    for index in np.argsort(drawn_utilities)[::-1][:n_trials]:
+        study.add_trial(create_trial(params=dict(zip(THRESHOLD_BOUNDS, drawn[index].tolist())),
+                                     distributions=THRESHOLD_DISTRIBUTIONS, value=float(drawn_utilities[index])))
+    return study.best_params
+
+
+class ThresholdTuner:
+    """
+    Background thread running tune_thresholds on snapshots of the metric history, so tuning never blocks the
+    MAPE-K loop. submit() hands over the latest snapshot and returns at once; a snapshot submitted while one
+    is being tuned replaces any snapshot still waiting. Each result is published as one (version, thresholds)
+    tuple, which readers pick up atomically through `published`. A submit() after stop() resumes tuning.
+    """
+
+    def __init__(self, study, n_candidates=200, n_trials=5, instrumentation=None):
+        self.study = study
+        self.n_candidates = n_candidates
+        self.n_trials = n_trials
+        self.instrumentation = instrumentation
+        self.published = (0, None)
+        self._pending = None
+        self._stopped = False
+        self._condition = threading.Condition()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+        self._working = False  # A thread is serving submissions; only changed under the condition
+
+    def submit(self, history):
+        with self._condition:
+            self._pending = history
+            self._stopped = False
+            self._idle.clear()
+            if not self._working:
+                self._working = True
+                self._thread = threading.Thread(target=self._work, name="threshold-tuner", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def wait(self, timeout=None):
+        '''Waits until every submitted snapshot has been tuned; returns False on timeout'''
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout=None):
+        '''Stops the thread once the tuning in progress, if any, has been published'''
+        with self._condition:
+            self._stopped = True
+            self._pending = None
+            self._condition.notify()
+            thread = self._thread
+        if thread:
+            thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    self._working = False
+                    self._idle.set()
+                    return
+                history, self._pending = self._pending, None
+            try:
+                timer = self.instrumentation.timer("tuner.optimize_thresholds") if self.instrumentation else nullcontext()
+                with timer:
+                    thresholds = tune_thresholds(self.study, history, self.n_candidates, self.n_trials)
+                self.published = (self.published[0] + 1, thresholds)
+            except Exception as e:
+                logging.warning(f"threshold tuning failed: {e}")
+            with self._condition:
+                if self._pending is None:
+                    self._idle.set()
@@ -1,10 +1,16 @@
 from abc import ABC, abstractmethod
-import requests
+import gzip
+import pickle
 import pprint
 
 from UPISAS.exceptions import EndpointNotReachable, ServerNotReachable
+from UPISAS.instrumentation import Instrumentation
 from UPISAS.knowledge import Knowledge
-from UPISAS import validate_schema, get_response_for_get_request
+from UPISAS.knowledge_log import KnowledgeLog
+from UPISAS.ring_buffer import RingBufferStore
+from UPISAS.telemetry import TelemetryStore
+from UPISAS.validation_policy import ValidationPolicy
+from UPISAS import validate_schema, compile_schema, get_response_for_get_request, get_response_for_put_request
 import logging
 
 pp = pprint.PrettyPrinter(indent=4)
@@ -15,43 +21,136 @@ class Strategy(ABC):
     def __init__(self, exemplar):
         self.exemplar = exemplar
         self.knowledge = Knowledge(dict(), dict(), dict(), dict(), dict(), dict(), dict())
+        self.validation_policy = ValidationPolicy()
+        self.knowledge_log = None
+        self.instrumentation = Instrumentation()
 
     def ping(self):
         ping_res = self._perform_get_request(self.exemplar.base_endpoint)
         logging.info(f"ping result: {ping_res}")
 
     def monitor(self, endpoint_suffix="monitor", with_validation=True, verbose=False):
-        fresh_data = self._perform_get_request(endpoint_suffix)
+        with self.instrumentation.timer("monitor"):
+            fresh_data = self._perform_get_request(endpoint_suffix)
+            return self.ingest_monitored_data(fresh_data, with_validation, verbose)
+
+    def ingest_monitored_data(self, fresh_data, with_validation=True, verbose=False):
+        '''Stores a sample fetched from the monitor endpoint in Knowledge, as monitor() does'''
         if(verbose): print("[Monitor]\tgot fresh_data: " + str(fresh_data))
         if with_validation:
             if(not self.knowledge.monitor_schema): self.get_monitor_schema()
-            validate_schema(fresh_data, self.knowledge.monitor_schema)
+        self._store_monitored_data(fresh_data, with_validation)
+        # if(verbose): print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
+        return True
+
+    def _store_monitored_data(self, fresh_data, with_validation=True):
+        if with_validation and self.validation_policy.should_validate():
+            self.validation_policy.validate(self._validate, fresh_data, "monitor_schema")
         data = self.knowledge.monitored_data
+        aggregates = self.knowledge.aggregates
         for key in list(fresh_data.keys()):
             if key not in data:
                 data[key] = []
             data[key].append(fresh_data[key])
-        # if(verbose): print("[Knowledge]\tdata monitored so far: " + str(self.knowledge.monitored_data))
-        return True
+            if key in aggregates:
+                for aggregate in aggregates[key].values():
+                    aggregate.update(fresh_data[key])
+        if self.knowledge_log: self.knowledge_log.append("monitor", fresh_data)
+
+    def use_ring_buffers(self, capacity, dtypes=None, spill_dir=None):
+        '''Keeps only the last `capacity` samples per monitored key, in NumPy ring buffers, so memory stays constant.
+        Older samples are dropped, or appended to one file per key under `spill_dir` if given.'''
+        store = RingBufferStore(capacity, dtypes, spill_dir)
+        for key, values in self.knowledge.monitored_data.items():
+            store[key] = values
+        self.knowledge.monitored_data = store
+        return store
+
+    def attach_knowledge_log(self, path, fsync=False):
+        '''Streams every monitored sample, analysis, plan and executed adaptation to an append-only log at `path`'''
+        self.close_knowledge_log()
+        self.knowledge_log = KnowledgeLog(path, fsync)
+        return self.knowledge_log
+
+    def close_knowledge_log(self):
+        if self.knowledge_log:
+            self.knowledge_log.close()
+            self.knowledge_log = None
+
+    def log_knowledge(self, kind):
+        '''Appends the current analysis_data ("analysis") or plan_data ("plan") to the knowledge log, if attached'''
+        if self.knowledge_log:
+            self.knowledge_log.append(kind, self.knowledge.analysis_data if kind == "analysis" else self.knowledge.plan_data)
+
+    def log_telemetry(self, sample):
+        '''Appends a container telemetry sample to the knowledge log, if attached; see Exemplar.start_telemetry()'''
+        if self.knowledge_log:
+            self.knowledge_log.append("telemetry", sample)
+
+    def subscribe_aggregate(self, key, name, aggregate):
+        '''Keeps `aggregate` up to date with the values monitored for `key`, readable as
+        knowledge.aggregates[key][name].value. Values monitored before subscribing are fed to it once.'''
+        for value in self.knowledge.monitored_data.get(key, []):
+            aggregate.update(value)
+        self.knowledge.aggregates.setdefault(key, {})[name] = aggregate
+        return aggregate
+
+    def get_state(self):
+        '''Learned state of the strategy, beyond its Knowledge, to be carried by snapshots. Override to add some.'''
+        return {}
+
+    def set_state(self, state):
+        '''Restores the state returned by get_state()'''
+        pass
+
+    def save_snapshot(self, path):
+        '''Saves the Knowledge and the learned state of the strategy to a compressed snapshot file'''
+        with gzip.open(path, "wb") as file:
+            pickle.dump({"knowledge": self.knowledge.snapshot(), "strategy": self.get_state()}, file)
+
+    def restore_snapshot(self, path, knowledge=True):
+        '''Warm-starts the strategy from a snapshot file; with knowledge=False only the learned state is restored'''
+        with gzip.open(path, "rb") as file:
+            snapshot = pickle.load(file)
+        if knowledge:
+            self.knowledge.restore(snapshot["knowledge"])
+        self.set_state(snapshot["strategy"])
+        logging.info(f"strategy restored from snapshot {path}")
+
+    def get_latest_monitored_data(self):
+        '''Returns the last sample stored by monitor(), so analysis acts on the data that was recorded'''
+        return {key: values[-1] for key, values in self.knowledge.monitored_data.items() if len(values) > 0}
+
+    def get_latest_telemetry(self):
+        '''Returns the last container telemetry sample, e.g. {"cpu_percent": 85.2, "memory_usage": ..., ...}'''
+        telemetry = self.knowledge.telemetry_data
+        return telemetry.latest() if isinstance(telemetry, TelemetryStore) else {}
 
     def execute(self, adaptation=None, endpoint_suffix="execute", with_validation=True):
         if(not adaptation): adaptation= self.knowledge.plan_data
-        if with_validation:
-            if(not self.knowledge.execute_schema): self.get_execute_schema()
-            validate_schema(adaptation, self.knowledge.execute_schema)
+        with self.instrumentation.timer("execute"):
+            if with_validation:
+                if(not self.knowledge.execute_schema): self.get_execute_schema()
+                self._validate(adaptation, "execute_schema")
+            self._perform_put_request(endpoint_suffix, adaptation)
+        if self.knowledge_log: self.knowledge_log.append("execute", adaptation)
+        return True
+
+    def _perform_put_request(self, endpoint_suffix: "API Endpoint", adaptation):
         url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
-        response = requests.put(url, params=adaptation)
+        with self.instrumentation.timer(f"PUT {endpoint_suffix}"):
+            response = get_response_for_put_request(url, adaptation, self.exemplar.session)
         print("[Execute]\tposted configuration: " + str(adaptation))
         if response.status_code == 404:
             logging.error("Cannot execute adaptation on remote system, check that the execute endpoint exists.")
             raise EndpointNotReachable
-        return True
+        return response
 
     def get_adaptation_options(self, endpoint_suffix: "API Endpoint" = "adaptation_options", with_validation=True):
         self.knowledge.adaptation_options = self._perform_get_request(endpoint_suffix)
         if with_validation:
             if(not self.knowledge.adaptation_options_schema): self.get_adaptation_options_schema()
-            validate_schema(self.knowledge.adaptation_options, self.knowledge.adaptation_options_schema)
+            self._validate(self.knowledge.adaptation_options, "adaptation_options_schema")
         logging.info("adaptation_options set to: ")
         pp.pprint(self.knowledge.adaptation_options)
 
@@ -70,9 +169,17 @@ class Strategy(ABC):
         logging.info("adaptation_options_schema set to: ")
         pp.pprint(self.knowledge.adaptation_options_schema)
 
+    def _validate(self, json_instance, schema_slot):
+        '''Validates against the Knowledge schema stored in `schema_slot`, reusing its compiled validator'''
+        json_schema = getattr(self.knowledge, schema_slot)
+        compiled = compile_schema(json_schema, self.knowledge.validators.get(schema_slot))
+        self.knowledge.validators[schema_slot] = compiled
+        validate_schema(json_instance, json_schema, compiled)
+
     def _perform_get_request(self, endpoint_suffix: "API Endpoint"):
         url = '/'.join([self.exemplar.base_endpoint, endpoint_suffix])
-        response = get_response_for_get_request(url)
+        with self.instrumentation.timer(f"GET {endpoint_suffix}"):
+            response = get_response_for_get_request(url, self.exemplar.session)
         if response.status_code == 404:
             logging.error("Please check that the endpoint you are trying to reach actually exists.")
             raise EndpointNotReachable
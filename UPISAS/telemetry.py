@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+
+from UPISAS.ring_buffer import RingBufferStore
+
+TELEMETRY_KEYS = ("cpu_percent", "memory_usage", "memory_limit", "memory_percent", "network_rx_bytes",
+                  "network_tx_bytes", "block_read_bytes", "block_write_bytes", "timestamp")
+
+
+def parse_stats(stats):
+    '''Flattens a `docker stats` sample: CPU % (100 per core), memory in bytes, network and block I/O bytes'''
+    cpu, precpu = stats.get("cpu_stats") or {}, stats.get("precpu_stats") or {}
+    cpu_delta = cpu.get("cpu_usage", {}).get("total_usage", 0) - precpu.get("cpu_usage", {}).get("total_usage", 0)
+    system_delta = cpu.get("system_cpu_usage", 0) - precpu.get("system_cpu_usage", 0)
+    online_cpus = cpu.get("online_cpus") or len(cpu.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+    memory = stats.get("memory_stats") or {}
+    memory_details = memory.get("stats") or {}
+    # Page cache is not memory pressure, as in the docker CLI
+    memory_usage = memory.get("usage", 0) - memory_details.get("inactive_file", memory_details.get("cache", 0))
+    memory_limit = memory.get("limit", 0)
+    networks = (stats.get("networks") or {}).values()
+    block_io = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+    return {
+        "cpu_percent": cpu_delta / system_delta * online_cpus * 100 if system_delta > 0 and cpu_delta > 0 else 0.0,
+        "memory_usage": memory_usage,
+        "memory_limit": memory_limit,
+        "memory_percent": memory_usage / memory_limit * 100 if memory_limit else 0.0,
+        "network_rx_bytes": sum(network.get("rx_bytes", 0) for network in networks),
+        "network_tx_bytes": sum(network.get("tx_bytes", 0) for network in networks),
+        "block_read_bytes": sum(entry.get("value", 0) for entry in block_io if entry.get("op", "").lower() == "read"),
+        "block_write_bytes": sum(entry.get("value", 0) for entry in block_io if entry.get("op", "").lower() == "write"),
+        "timestamp": time.time(),
+    }
+
+
+class TelemetryStore(RingBufferStore):
+    """
+    The last `capacity` telemetry samples, one RingBuffer per TELEMETRY_KEYS entry. A sample is appended and
+    read as a whole under `lock`, so readers never see part of one; hold the lock to read several buffers at once.
+    """
+
+    def __init__(self, capacity=3600, spill_dir=None):
+        super().__init__(capacity, spill_dir=spill_dir)
+        self.lock = threading.Lock()
+        for key in TELEMETRY_KEYS:
+            self[key] = []
+
+    def append(self, sample):
+        with self.lock:
+            for key in TELEMETRY_KEYS:
+                self[key].append(sample[key])
+
+    def latest(self):
+        '''The last sample stored, or an empty dict'''
+        with self.lock:
+            return {key: buffer.last(1).tolist()[0] for key, buffer in self.items() if len(buffer) > 0}
+
+
+class ContainerTelemetry:
+    """
+    Background thread streaming the `docker stats` of a container into `knowledge.telemetry_data`, a
+    TelemetryStore of the last `capacity` samples, alongside the data monitored over HTTP. Docker produces about
+    one sample per second; one every `interval` seconds is kept. `on_sample(sample)` is called for every sample kept.
+    """
+
+    def __init__(self, container, knowledge, interval=1.0, on_sample=None, capacity=3600):
+        self.container = container
+        self.knowledge = knowledge
+        self.interval = interval
+        self.on_sample = on_sample
+        self.capacity = capacity
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        # The store exists before the thread starts, so readers never see it replaced mid-run
+        if not isinstance(self.knowledge.telemetry_data, TelemetryStore):
+            self.knowledge.telemetry_data = TelemetryStore(self.capacity)
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._stream, name="container-telemetry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        '''Stops streaming; waits for the sample being read, if any, up to `timeout` seconds'''
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(self.interval + 2 if timeout is None else timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _stream(self):
+        next_sample = time.monotonic()
+        try:
+            for stats in self.container.stats(stream=True, decode=True):
+                if self._stopped.is_set():
+                    break
+                now = time.monotonic()
+                if now < next_sample:
+                    continue
+                next_sample = max(next_sample + self.interval, now)
+                self._store(parse_stats(stats))
+        except Exception as e:
+            if not self._stopped.is_set():
+                logging.warning(f"container telemetry stopped: {e}")
+
+    def _store(self, sample):
+        self.knowledge.telemetry_data.append(sample)
+        self.samples += 1
+        if self.on_sample:
+            self.on_sample(sample)
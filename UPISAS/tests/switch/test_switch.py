@@ -5,7 +5,6 @@ from time import sleep
 
 from UPISAS.strategies.SwitchStrategy import SwitchStrategy
 from UPISAS.exemplars.switch_exemplar import SwitchExemplar
-import UPISAS.exemplars.switch_interface as SwitchInterface
 from UPISAS import validate_schema
 
 
@@ -14,15 +13,16 @@ class TestStrategy(unittest.TestCase):
     def setUp(self):
         self.exemplar = SwitchExemplar(auto_start=False)
         self.strategy = SwitchStrategy(self.exemplar)
+        self.interface = self.exemplar.interface
         try:
-            self.monitor_data = SwitchInterface.get_monitor_data()
+            self.monitor_data = self.interface.get_monitor_data()
             assert self.monitor_data is not None, "Monitor data should not be None"
             print("API is up and running.")
         except Exception as e:
             raise Exception(f"API is not running or /monitor endpoint failed during setUpClass: {e}")
 
     def test_monitor_successfully(self):
-        data = SwitchInterface.get_monitor_data()
+        data = self.interface.get_monitor_data()
         self.assertTrue(len(data) > 0, "Monitor data should not be empty")
         # Optionally, check for expected keys
         expected_keys = ["input_rate", "model", "cpu", "confidence", "image_processing_time"]
@@ -31,7 +31,7 @@ class TestStrategy(unittest.TestCase):
             self.assertIn(key, data, f"Key '{key}' not found in monitor data")
 
     def test_get_adaptation_options(self):
-        options = SwitchInterface.get_adaptation_options()
+        options = self.interface.get_adaptation_options()
         self.assertIsNotNone(options, "Adaptation options should not be None")
         self.assertIsInstance(options, dict, "Adaptation options should be a dictionary")
         self.assertTrue(len(options) > 0, "Adaptation options should not be empty")
@@ -50,11 +50,11 @@ class TestStrategy(unittest.TestCase):
         """Test that an adaptation option can be updated successfully."""
         option_to_update = 'yolov5n_rate_min'
         new_value = 0.5
-        result = SwitchInterface.execute_action(option_to_update, new_value)
+        result = self.interface.execute_action(option_to_update, new_value)
         self.assertIn('message', result, "Response does not contain 'message'")
         self.assertIn("updated to", result['message'], "Update confirmation not found in response message")
         # Verify that the adaptation option was updated
-        options = SwitchInterface.get_adaptation_options()
+        options = self.interface.get_adaptation_options()
         updated_value = float(options.get(option_to_update))
         self.assertEqual(
             updated_value, new_value,
@@ -81,7 +81,7 @@ class TestStrategy(unittest.TestCase):
         print("Adaptation options schema:", self.strategy.knowledge.adaptation_options_schema)
 
     def test_schema(self):
-            fresh_data =  SwitchInterface.get_monitor_data()
+            fresh_data =  self.interface.get_monitor_data()
             print("[Monitor]\tgot fresh_data: " + str(fresh_data))
             if (not self.strategy.knowledge.monitor_schema): self.strategy.get_monitor_schema()
             print("fresh_data", fresh_data)
@@ -138,7 +138,7 @@ class TestStrategy(unittest.TestCase):
     # def test_monitor_data(self):
     #     successful = False
     #     while successful == False:
-    #         data = SwitchInterface.get_monitor_data()
+    #         data = self.interface.get_monitor_data()
     #         expected_keys = [
     #             "input_rate",
     #             "model",
@@ -0,0 +1,162 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from UPISAS import create_session
+from UPISAS.exemplar import Exemplar
+
+MONITOR_SCHEMA = {"type": "object", "properties": {"f": {"type": "number"}}}
+EXECUTE_SCHEMA = {"type": "object", "properties": {"x": {"type": "number"}, "y": {"type": "number"}}}
+ADAPTATION_OPTIONS = {"x": {"start": -4.0, "stop": 6.0, "type": "continuous"}}
+ADAPTATION_OPTIONS_SCHEMA = {"type": "object", "properties": {"x": {"type": "object"}}}
+
+
+class FakeExemplar:
+    """
+    Serves the endpoints of the demo managed system from a local thread, so Strategy code can be tested without docker.
+    Every request is counted per path in `requests`; monitored values are taken from `monitor_values`, each either
+    the value of "f" or a whole sample dict.
+    """
+
+    def __init__(self, monitor_values=None):
+        self.requests = {}
+        self.executed = []
+        self.monitor_values = list(monitor_values or [1.0])
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.base_endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.session = create_session()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _next_monitor_value(self):
+        with self._lock:
+            count = self.requests.get("/monitor", 0)
+            return self.monitor_values[min(count - 1, len(self.monitor_values) - 1)]
+
+    def _count(self, path):
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def _handler(self):
+        exemplar = self
+        routes = {
+            "/": "alive",
+            "/monitor_schema": MONITOR_SCHEMA,
+            "/execute_schema": EXECUTE_SCHEMA,
+            "/adaptation_options": ADAPTATION_OPTIONS,
+            "/adaptation_options_schema": ADAPTATION_OPTIONS_SCHEMA,
+        }
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                exemplar._count(self.path)
+                if self.path == "/monitor":
+                    value = exemplar._next_monitor_value()
+                    self._reply(200, value if isinstance(value, dict) else {"f": value})
+                elif self.path in routes:
+                    self._reply(200, routes[self.path])
+                else:
+                    self._reply(404, {})
+
+            def do_PUT(self):
+                path = self.path.split("?")[0]
+                exemplar._count(path)
+                if path == "/execute":
+                    exemplar.executed.append(self.path)
+                    self._reply(200, "ok")
+                else:
+                    self._reply(404, {})
+
+            def _reply(self, status, body):
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+class FakeContainer:
+    """ Records the lifecycle operations of a docker container."""
+
+    def __init__(self, fail_restart=False, exec_exit_code=0):
+        self.status = "running"
+        self.attrs = {"State": {}}
+        self.calls = []
+        self.archives = {}
+        self.fail_restart = fail_restart
+        self.exec_exit_code = exec_exit_code
+
+    def reload(self):
+        pass
+
+    def start(self):
+        self.calls.append("start")
+        self.status = "running"
+
+    def stop(self):
+        self.calls.append("stop")
+        self.status = "exited"
+
+    def pause(self):
+        self.calls.append("pause")
+        self.status = "paused"
+
+    def unpause(self):
+        self.calls.append("unpause")
+        self.status = "running"
+
+    def update(self, **kwargs):
+        self.calls.append(("update", kwargs))
+
+    def remove(self, force=False):
+        self.calls.append("remove")
+
+    def restart(self):
+        self.calls.append("restart")
+        if self.fail_restart:
+            raise RuntimeError("restart failed")
+
+    def get_archive(self, path):
+        return [b"tar of ", path.encode()], {}
+
+    def exec_run(self, cmd):
+        self.calls.append(" ".join(cmd))
+        return self.exec_exit_code, b""
+
+    def put_archive(self, path, data):
+        self.archives[path] = data
+        return True
+
+
+class WarmExemplar(Exemplar):
+    """ Exemplar whose containers are FakeContainers instead of docker containers."""
+
+    def __init__(self, container):
+        self.base_endpoint = "http://localhost:3000"
+        self.session = None
+        self.docker_kwargs = {"image": "fake", "name": "fake"}
+        self.warm_pool = False
+        self.exemplar_container = container
+        self.created = []
+
+    def create_container(self, docker_client=None):
+        self.exemplar_container = FakeContainer()
+        self.exemplar_container.status = "created"
+        self.created.append(self.exemplar_container)
+        return self.exemplar_container
+
+    def start_run(self):
+        pass
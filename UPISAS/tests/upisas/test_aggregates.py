@@ -0,0 +1,62 @@
+import unittest
+import random
+from types import SimpleNamespace
+
+from UPISAS.aggregates import Aggregate, RunningMean, WindowedMean, EWMA, StreamingQuantile
+from UPISAS.strategies.demo_strategy import DemoStrategy
+
+
+class TestAggregates(unittest.TestCase):
+    """
+    Test cases for the incremental aggregates kept over monitored data.
+    """
+
+    def test_aggregate_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Aggregate()
+
+    def test_running_mean(self):
+        mean = RunningMean()
+        self.assertEqual(mean.value, 0)
+        for value in [1, 2, 3, 6]:
+            mean.update(value)
+        self.assertEqual(mean.value, 3)
+
+    def test_windowed_mean(self):
+        mean = WindowedMean(2)
+        for value in [1, 2, 3, 6]:
+            mean.update(value)
+        self.assertEqual(mean.value, 4.5)
+
+    def test_ewma(self):
+        ewma = EWMA(0.5)
+        for value in [2, 4, 8]:
+            ewma.update(value)
+        self.assertEqual(ewma.value, 5.5)
+
+    def test_streaming_quantile(self):
+        generator = random.Random(42)
+        values = [generator.uniform(0, 100) for _ in range(5000)]
+        quantile = StreamingQuantile(0.9)
+        for value in values:
+            quantile.update(value)
+        self.assertAlmostEqual(quantile.value, sorted(values)[int(0.9 * len(values))], delta=2)
+
+    def test_streaming_quantile_with_few_values(self):
+        quantile = StreamingQuantile(0.5)
+        for value in [3, 1, 2]:
+            quantile.update(value)
+        self.assertEqual(quantile.value, 2)
+
+    def test_strategy_subscription(self):
+        strategy = DemoStrategy(SimpleNamespace(base_endpoint="http://localhost:3000", session=None))
+        strategy._store_monitored_data({"f": 1.0}, with_validation=False)
+        maximum = strategy.subscribe_aggregate("f", "p100", StreamingQuantile(1.0))
+        strategy._store_monitored_data({"f": 3.0}, with_validation=False)
+        self.assertTrue(strategy.analyze())
+        self.assertEqual(strategy.knowledge.analysis_data["mean_f"], 2.0)
+        self.assertEqual(maximum.value, 3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import asyncio
+
+from UPISAS.async_strategy import AsyncStrategy, run_mape_k, run_mape_k_many
+from UPISAS.tests.upisas.fake_exemplar import FakeExemplar, MONITOR_SCHEMA
+
+
+class AsyncDemoStrategy(AsyncStrategy):
+
+    def analyze(self):
+        data = self.knowledge.monitored_data
+        self.knowledge.analysis_data["mean_f"] = sum(data["f"]) / len(data["f"])
+        return True
+
+    def plan(self):
+        if self.knowledge.analysis_data["mean_f"] > 0:
+            self.knowledge.plan_data = {"x": 2, "y": 5}
+            return True
+        return False
+
+
+class TestAsyncStrategy(unittest.TestCase):
+    """
+    Test cases for the AsyncStrategy class, against a local fake of the demo managed system.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0, 2.0, 3.0])
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def test_initialize_fetches_schemas_and_adaptation_options(self):
+        strategy = AsyncDemoStrategy(self.exemplar)
+        self.assertTrue(asyncio.run(strategy.initialize()))
+        self.assertEqual(strategy.knowledge.monitor_schema, MONITOR_SCHEMA)
+        self.assertNotEqual(strategy.knowledge.adaptation_options, dict())
+        for path in ["/monitor_schema", "/execute_schema", "/adaptation_options_schema", "/adaptation_options"]:
+            self.assertEqual(self.exemplar.requests[path], 1)
+
+    def test_monitor_successfully(self):
+        strategy = AsyncDemoStrategy(self.exemplar)
+        self.assertTrue(asyncio.run(strategy.monitor()))
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [1.0])
+
+    def test_run_mape_k(self):
+        strategy = AsyncDemoStrategy(self.exemplar)
+        iterations = asyncio.run(run_mape_k(strategy, period=0, iterations=3))
+        self.assertEqual(iterations, 3)
+        self.assertEqual(strategy.knowledge.monitored_data["f"], [1.0, 2.0, 3.0])
+        self.assertEqual(len(self.exemplar.executed), 3)
+
+    def test_run_mape_k_many_with_stop_condition(self):
+        other_exemplar = FakeExemplar()
+        try:
+            strategies = [AsyncDemoStrategy(self.exemplar), AsyncDemoStrategy(other_exemplar)]
+            stop = lambda strategy: len(strategy.knowledge.monitored_data["f"]) == 2
+            iterations = asyncio.run(run_mape_k_many(strategies, period=0, iterations=5, stop_condition=stop))
+            self.assertEqual(iterations, [2, 2])
+        finally:
+            other_exemplar.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
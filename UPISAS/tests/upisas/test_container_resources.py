@@ -0,0 +1,55 @@
+import unittest
+import json
+import tempfile
+from pathlib import Path
+
+from UPISAS.container_resources import ContainerResources, parse_cpuset
+from UPISAS.tests.upisas.fake_exemplar import FakeContainer, WarmExemplar
+
+
+class TestContainerResources(unittest.TestCase):
+    """
+    Test cases for the CPU and memory resources of exemplar containers.
+    """
+
+    def test_docker_kwargs(self):
+        resources = ContainerResources(cpuset_cpus="0-1", cpus=1.5, mem_limit="2g")
+        self.assertEqual(resources.to_docker_kwargs(), {
+            "cpuset_cpus": "0-1", "cpu_period": 100000, "cpu_quota": 150000, "mem_limit": "2g", "memswap_limit": "2g"})
+        self.assertEqual(ContainerResources().to_docker_kwargs(), {})
+
+    def test_from_run_variation(self):
+        variation = {"__run_id": "run_0_repetition_0", "rt_threshold": 0.75, "cpus": "2", "mem_limit": "1g"}
+        self.assertEqual(ContainerResources.from_run_variation(variation),
+                         ContainerResources(cpus=2.0, mem_limit="1g"))
+
+    def test_invalid_resources(self):
+        self.assertEqual(parse_cpuset("0-2,5"), {0, 1, 2, 5})
+        with self.assertRaises(ValueError):
+            ContainerResources(cpuset_cpus="a-b")
+        with self.assertRaises(ValueError):
+            ContainerResources(cpus=0)
+
+    def test_applied_resources_are_merged_and_recorded(self):
+        container = FakeContainer()
+        exemplar = WarmExemplar(container)
+        exemplar.apply_resources(ContainerResources(cpuset_cpus="2-3"))
+        resources = exemplar.apply_resources(ContainerResources(cpus=1.0, mem_limit="1g"))
+        self.assertEqual(resources, ContainerResources(cpuset_cpus="2-3", cpus=1.0, mem_limit="1g"))
+        self.assertEqual(container.calls[-1], ("update", resources.to_docker_kwargs()))
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "resources.json"
+            resources.save(path)
+            with open(path) as file:
+                self.assertEqual(json.load(file), {"cpuset_cpus": "2-3", "cpus": 1.0, "mem_limit": "1g"})
+
+    def test_unconstrained_run_leaves_container_alone(self):
+        container = FakeContainer()
+        exemplar = WarmExemplar(container)
+        resources = exemplar.apply_resources(ContainerResources.from_run_variation({"rt_threshold": 0.5}))
+        self.assertEqual(resources, ContainerResources())
+        self.assertEqual(container.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+import queue
+import time
+
+from UPISAS.docker_state import ContainerStateCache
+from UPISAS.tests.upisas.fake_exemplar import FakeContainer, WarmExemplar
+
+
+class FakeEvents:
+    """ Cancellable stream of docker events fed from a queue."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def __iter__(self):
+        while True:
+            event = self.events.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.events.put(None)
+
+
+class FakeClient:
+
+    def __init__(self):
+        self.events_queue = queue.Queue()
+        self.streams = 0
+
+    def events(self, decode, filters):
+        self.streams += 1
+        return FakeEvents(self.events_queue)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class TestContainerStateCache(unittest.TestCase):
+    """
+    Test cases for the container status cache kept up to date by docker events.
+    """
+
+    def setUp(self):
+        self.client = FakeClient()
+        self.cache = ContainerStateCache(self.client, reconnect_delay=0.01).start()
+        self.assertTrue(wait_for(lambda: self.cache.connected))
+
+    def tearDown(self):
+        self.cache.stop()
+
+    def test_events_update_status_and_health(self):
+        self.assertIsNone(self.cache.status("c1"))
+        for action in ["create", "start", "health_status: healthy", "pause"]:
+            self.client.events_queue.put({"id": "c1", "Action": action, "timeNano": time.time_ns()})
+        self.assertTrue(wait_for(lambda: self.cache.status("c1") == "paused"))
+        self.assertEqual(self.cache.health("c1"), "healthy")
+
+    def test_events_are_ordered_by_daemon_time(self):
+        self.cache.apply_event({"id": "c1", "Action": "start", "timeNano": 2000})
+        self.cache.set("c1", "exited")
+        self.cache.apply_event({"id": "c1", "Action": "start", "timeNano": 1000})
+        self.assertEqual(self.cache.status("c1"), "exited")
+        # Daemon clock far behind the host's: the event is still newer than the last one applied
+        self.cache.apply_event({"id": "c1", "Action": "restart", "timeNano": 3000})
+        self.assertEqual(self.cache.status("c1"), "running")
+
+    def test_interrupted_stream_invalidates_cache_and_reconnects(self):
+        self.cache.set("c1", "running")
+        self.client.events_queue.put(None)
+        self.assertTrue(wait_for(lambda: self.client.streams == 2 and self.cache.connected))
+        self.assertIsNone(self.cache.status("c1"))
+
+    def test_exemplar_status_is_served_from_cache(self):
+        container = FakeContainer()
+        container.id = "c1"
+        container.reloads = 0
+        container.reload = lambda: setattr(container, "reloads", container.reloads + 1)
+        exemplar = WarmExemplar(container)
+        exemplar.container_states = self.cache
+        self.assertEqual(exemplar.get_container_status(), "running")
+        self.assertEqual(exemplar.pause_container(), True)
+        for _ in range(10):
+            self.assertEqual(exemplar.get_container_status(), "paused")
+        self.assertEqual(container.reloads, 1)
+        exemplar.stop_container()
+        self.assertIsNone(self.cache.status("c1"))
+
+    def test_health_is_reloaded_when_not_cached(self):
+        container = FakeContainer()
+        container.id = "c1"
+        container.reload = lambda: container.attrs.update({"State": {"Health": {"Status": "healthy"}}})
+        container.attrs = {"State": {"Health": {"Status": "starting"}}}
+        exemplar = WarmExemplar(container)
+        exemplar.container_states = None
+        self.assertTrue(exemplar.container_is_ready())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import socket
+from types import SimpleNamespace
+
+import docker
+
+from UPISAS.exemplar import Exemplar
+from UPISAS.exemplar_fleet import ExemplarFleet, allocate_free_ports
+from UPISAS.exemplars.switch_exemplar import SwitchExemplar
+
+
+class FakeExemplar(Exemplar):
+    """ Exemplar that only remaps its ports, without creating a docker container."""
+    docker_ports = (3000, 4242)
+
+    def __init__(self, container_name="fake", host_ports=None):
+        self.base_endpoint = "http://localhost:3000"
+        self.docker_kwargs = {"name": container_name, "image": "fake", "ports": {3000: 3000, 4242: 4242}}
+        self.session = None
+        if host_ports:
+            self._use_host_ports(host_ports)
+
+    def start_run(self):
+        pass
+
+    def stop_container(self, remove=True):
+        self.stopped = remove
+        return True
+
+
+class ConflictingExemplar(FakeExemplar):
+    """ FakeExemplar whose first start fails because another process took one of its host ports."""
+
+    def __init__(self, container_name="fake", host_ports=None):
+        super().__init__(container_name, host_ports)
+        self.conflicts = 1
+        self.rebinds = []
+
+    def start_container(self):
+        if self.conflicts:
+            self.conflicts -= 1
+            raise docker.errors.APIError("driver failed programming external connectivity: "
+                                         "Bind for 0.0.0.0:41000 failed: port is already allocated")
+        return True
+
+    def rebind_host_ports(self, host_ports):
+        self.rebinds.append(host_ports)
+        self._use_host_ports(host_ports)
+
+
+class FakeContainers:
+    """ docker.containers listing matching names as docker does: as regular expressions, i.e. substrings."""
+
+    def __init__(self, names):
+        self.names = names
+        self.filters = []
+
+    def list(self, all, filters):
+        self.filters.append(filters)
+        return [SimpleNamespace(name=name) for name in self.names]
+
+
+class TestExemplarFleet(unittest.TestCase):
+    """
+    Test cases for running several instances of an exemplar side by side.
+    """
+
+    def test_free_ports_are_distinct_and_bindable(self):
+        ports = allocate_free_ports(5)
+        self.assertEqual(len(set(ports)), 5)
+        with socket.socket() as sock:
+            sock.bind(("", ports[0]))
+
+    def test_host_ports_rewrite_base_endpoint(self):
+        exemplar = SwitchExemplar.__new__(SwitchExemplar)
+        exemplar.base_endpoint = "http://localhost:8000"
+        exemplar.docker_kwargs = {"ports": {3001: 3001, 8000: 8000}}
+        exemplar._use_host_ports({3001: 41001, 8000: 48000})
+        self.assertEqual(exemplar.base_endpoint, "http://localhost:48000")
+        self.assertEqual(exemplar.host_url(3001), "http://localhost:41001")
+
+    def test_instances_get_unique_names_and_ports(self):
+        with ExemplarFleet(FakeExemplar, 3, name_prefix="swim") as fleet:
+            strategies = fleet.create_strategies(lambda exemplar: ("strategy", exemplar))
+            self.assertEqual([exemplar.docker_kwargs["name"] for exemplar in fleet], ["swim-0", "swim-1", "swim-2"])
+            endpoints = {exemplar.base_endpoint for exemplar in fleet}
+            self.assertEqual(len(endpoints), 3)
+            self.assertNotIn("http://localhost:3000", endpoints)
+            ports = [port for exemplar in fleet for port in exemplar.docker_kwargs["ports"].values()]
+            self.assertEqual(len(set(ports)), 6)
+            self.assertEqual([strategy[1] for strategy in strategies], fleet.exemplars)
+        self.assertTrue(all(exemplar.stopped for exemplar in fleet))
+
+    def test_existing_container_is_found_by_exact_name(self):
+        client = SimpleNamespace(containers=FakeContainers(["swim-10", "swim-1"]))
+        self.assertEqual(Exemplar._find_container(client, "swim-1").name, "swim-1")
+        self.assertEqual(client.containers.filters, [{"name": "^/swim-1$"}])
+        self.assertIsNone(Exemplar._find_container(SimpleNamespace(containers=FakeContainers(["swim-10"])), "swim-1"))
+        self.assertIsNone(Exemplar._find_container(client, None))
+
+    def test_published_ports(self):
+        container = SimpleNamespace(attrs={"HostConfig": {"PortBindings": {
+            "3000/tcp": [{"HostIp": "", "HostPort": "41000"}], "4242/tcp": None}}})
+        self.assertEqual(Exemplar._published_ports(container), {3000: 41000})
+
+    def test_port_conflict_is_retried_on_new_ports(self):
+        fleet = ExemplarFleet(ConflictingExemplar, 2)
+        fleet.launch()
+        endpoints = [exemplar.base_endpoint for exemplar in fleet]
+        self.assertEqual(fleet.start_all(), [True, True])
+        for exemplar, endpoint in zip(fleet, endpoints):
+            self.assertEqual(len(exemplar.rebinds), 1)
+            self.assertNotEqual(exemplar.base_endpoint, endpoint)
+            self.assertEqual(exemplar.docker_kwargs["ports"], exemplar.rebinds[0])
+
+    def test_conflict_is_raised_once_retries_run_out(self):
+        fleet = ExemplarFleet(ConflictingExemplar, 1, port_retries=0)
+        fleet.launch()
+        with self.assertRaises(docker.errors.APIError):
+            fleet.start_all()
+
+    def test_class_without_docker_ports(self):
+        with self.assertRaises(ValueError):
+            ExemplarFleet(Exemplar, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
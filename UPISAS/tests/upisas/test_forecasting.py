@@ -0,0 +1,70 @@
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+
+from UPISAS.strategies.helpers.forecasting import Forecaster, ForecastingEngine, LinearTrend, EWMA, Holt, AutoRegressive
+from UPISAS.strategies.helpers.predict import PREDICTED_METRICS
+from UPISAS.strategies.PredictiveSwitchStrategy import SwitchStrategy
+from UPISAS.tests.upisas.test_predict import metric_history
+
+
+def feed(model, series):
+    for value in series:
+        model.observe(np.array([value], dtype=float))
+    return model
+
+
+class TestForecasting(unittest.TestCase):
+    """
+    Test cases for the sliding-window forecasting models and the engine choosing between them.
+    """
+
+    def test_forecaster_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Forecaster(1)
+
+    def test_linear_trend_fits_the_window_only(self):
+        series = [50.0] * 30 + [2.0 * i for i in range(10)]
+        model = feed(LinearTrend(1, window=10), series)
+        self.assertAlmostEqual(model.predict(5)[0], 28.0)
+        slope, intercept = np.polyfit(range(20), series[-20:], 1)
+        self.assertAlmostEqual(feed(LinearTrend(1, window=20), series).predict(3)[0], intercept + slope * 22)
+
+    def test_models_follow_their_series(self):
+        self.assertAlmostEqual(feed(EWMA(1), [3.0] * 5).predict(10)[0], 3.0)
+        self.assertAlmostEqual(feed(Holt(1, 0.8, 0.8), [float(i) for i in range(200)]).predict(5)[0], 204.0)
+        alternating = [10.0 + (1 if i % 2 else -1) for i in range(500)]
+        self.assertAlmostEqual(feed(AutoRegressive(1, p=2), alternating).predict(1)[0], 9.0, places=1)
+
+    def test_error_is_scored_at_the_horizon(self):
+        model = feed(EWMA(1, alpha=1.0, horizon=2, error_window=3), [0.0, 1.0, 2.0])
+        self.assertEqual(model.error.tolist(), [2.0])
+        feed(model, [2.0, 2.0, 2.0, 2.0])
+        self.assertEqual(model.error.tolist(), [0.0])
+        self.assertEqual(EWMA(2).error.tolist(), [np.inf, np.inf])
+
+    def test_engine_picks_best_model_per_metric(self):
+        engine = ForecastingEngine(["trend", "flat"], horizon=5, window=10)
+        for i in range(40):
+            engine.update({"trend": 3.0 * i, "flat": 7.0})
+            self.assertEqual(engine.ready, i >= 9)
+        best = engine.best_models()
+        self.assertIn(best["trend"], ("linear_trend", "holt"))
+        self.assertAlmostEqual(engine.predict()["trend"], 3.0 * 44, places=3)
+        self.assertAlmostEqual(engine.predict(1)["flat"], 7.0)
+        self.assertEqual(set(engine.errors()), {"linear_trend", "ewma", "holt", "ar3"})
+
+    def test_strategy_state_rebuilds_engine(self):
+        strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+        history = metric_history(30)
+        strategy.set_state({"count": 30, "metric_history": history, "thresholds": strategy.thresholds, "trials": []})
+        engine = ForecastingEngine(PREDICTED_METRICS, horizon=10, window=20)
+        for record in history:
+            engine.update(record)
+        self.assertEqual(strategy.forecasting_engine.count, 30)
+        self.assertEqual(strategy.forecasting_engine.predict(), engine.predict())
+
+
+if __name__ == '__main__':
+    unittest.main()
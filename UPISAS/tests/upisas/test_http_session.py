@@ -0,0 +1,67 @@
+import unittest
+import socket
+from types import SimpleNamespace
+
+import requests
+
+from UPISAS.exceptions import ServerNotReachable
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.tests.upisas.fake_exemplar import FakeExemplar
+
+
+class RecordingSession(requests.Session):
+    """ Session recording the method of every request sent through it."""
+
+    def __init__(self):
+        super().__init__()
+        self.methods = []
+
+    def request(self, method, url, *args, **kwargs):
+        self.methods.append(method)
+        return super().request(method, url, *args, **kwargs)
+
+
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestHttpSession(unittest.TestCase):
+    """
+    Test cases for the HTTP requests of a Strategy, through the session of its exemplar or without one.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0])
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def test_get_and_put_go_through_the_exemplar_session(self):
+        self.exemplar.session = RecordingSession()
+        strategy = DemoStrategy(self.exemplar)
+        strategy.monitor()
+        strategy.analyze()
+        strategy.plan()
+        strategy.execute()
+        self.assertEqual(self.exemplar.session.methods, ["GET", "GET", "GET", "PUT"])
+        self.assertEqual(self.exemplar.executed, ["/execute?x=2&y=5"])
+
+    def test_requests_without_a_session(self):
+        strategy = DemoStrategy(SimpleNamespace(base_endpoint=self.exemplar.base_endpoint, session=None))
+        strategy.monitor()
+        strategy.execute({"x": 1, "y": 2})
+        self.assertEqual(self.exemplar.requests["/monitor"], 1)
+        self.assertEqual(self.exemplar.executed, ["/execute?x=1&y=2"])
+
+    def test_unreachable_server(self):
+        strategy = DemoStrategy(SimpleNamespace(base_endpoint=f"http://127.0.0.1:{closed_port()}", session=None))
+        with self.assertRaises(ServerNotReachable):
+            strategy.monitor(with_validation=False)
+        with self.assertRaises(ServerNotReachable):
+            strategy.execute({"x": 1, "y": 2}, with_validation=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+import tempfile
+from pathlib import Path
+
+from UPISAS.instrumentation import LatencyHistogram, Instrumentation
+from UPISAS.mapek_loop import MAPEKLoop
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.tests.upisas.fake_exemplar import FakeExemplar
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """
+    Test cases for the log-linear latency histogram.
+    """
+
+    def test_percentiles_within_bucket_precision(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+        self.assertEqual(histogram.count, 1000)
+        self.assertAlmostEqual(histogram.mean, 0.5005)
+        for percentile, exact in [(50, 0.5), (90, 0.9), (99, 0.99)]:
+            self.assertGreaterEqual(histogram.percentile(percentile), exact)
+            self.assertLessEqual(histogram.percentile(percentile), exact * (1 + 1 / 32))
+        self.assertEqual(histogram.percentile(100), 1.0)
+
+    def test_bucket_count_is_logarithmic(self):
+        histogram = LatencyHistogram(significant_bits=3)
+        for micros in range(1, 100000):
+            histogram.record(micros / 1e6)
+        self.assertLess(len(histogram.buckets()), 16 * 8)
+        self.assertEqual(sum(count for _, _, count in histogram.buckets()), 99999)
+
+    def test_disabled_instrumentation_records_nothing(self):
+        instrumentation = Instrumentation(enabled=False)
+        with instrumentation.timer("monitor"):
+            pass
+        self.assertEqual(instrumentation.summary(), {})
+
+
+class TestStrategyInstrumentation(unittest.TestCase):
+    """
+    Test cases for the latencies recorded around the MAPE-K phases and HTTP calls.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0, 2.0])
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.exemplar.stop()
+        self.directory.cleanup()
+
+    def test_phases_and_endpoints_are_timed(self):
+        strategy = DemoStrategy(self.exemplar)
+        MAPEKLoop(strategy, period=0, max_iterations=2).run()
+        summary = strategy.instrumentation.summary()
+        for name in ["monitor", "analyze", "plan", "execute", "GET monitor", "PUT execute"]:
+            self.assertEqual(summary[name]["count"], 2, name)
+        self.assertEqual(summary["GET monitor_schema"]["count"], 1)
+        self.assertGreaterEqual(summary["monitor"]["total"], summary["GET monitor"]["total"])
+
+        path = Path(self.directory.name) / "latency.json"
+        strategy.instrumentation.dump(path)
+        with open(path) as file:
+            report = json.load(file)
+        self.assertEqual(report["execute"]["count"], 2)
+        self.assertEqual(sum(bucket[2] for bucket in report["execute"]["buckets"]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from UPISAS.knowledge_log import KnowledgeLog, KnowledgeLogReader
+from UPISAS.strategies.empty_strategy import EmptyStrategy
+
+
+class TestKnowledgeLog(unittest.TestCase):
+    """
+    Test cases for the append-only knowledge log and its memory-mapped reader.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "run" / "knowledge.log"
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_records_strategy_activity(self):
+        strategy = EmptyStrategy(SimpleNamespace(base_endpoint="http://localhost:3000", session=None))
+        strategy.attach_knowledge_log(self.path)
+        for value in [1.0, 2.0]:
+            strategy._store_monitored_data({"f": value, "model": "yolov5n"}, with_validation=False)
+        strategy.knowledge.analysis_data["mean_f"] = np.float64(1.5)
+        strategy.log_knowledge("analysis")
+        strategy.knowledge.plan_data = {"x": 2, "y": 5}
+        strategy.log_knowledge("plan")
+        strategy.close_knowledge_log()
+
+        with KnowledgeLogReader(self.path) as reader:
+            self.assertEqual(len(reader), 4)
+            self.assertEqual(reader.count("monitor"), 2)
+            self.assertEqual(reader.column("f").tolist(), [1.0, 2.0])
+            self.assertEqual(list(reader.records("analysis"))[0][2], {"mean_f": 1.5})
+            self.assertEqual(reader.record(-1)[0], "plan")
+            self.assertEqual(len(reader.timestamps("monitor")), 2)
+
+    def test_truncated_record_is_ignored(self):
+        with KnowledgeLog(self.path) as log:
+            log.append("monitor", {"f": 1.0})
+            log.append("monitor", {"f": 2.0})
+        with open(self.path, "r+b") as file:
+            file.truncate(self.path.stat().st_size - 3)
+        with KnowledgeLogReader(self.path) as reader:
+            self.assertEqual(reader.column("f").tolist(), [1.0])
+
+    def test_appending_to_an_existing_log(self):
+        for value in [1.0, 2.0]:
+            with KnowledgeLog(self.path) as log:
+                log.append("monitor", {"f": value})
+        with KnowledgeLogReader(self.path) as reader:
+            self.assertEqual(reader.column("f").tolist(), [1.0, 2.0])
+
+    def test_reopening_cuts_off_a_truncated_record(self):
+        with KnowledgeLog(self.path) as log:
+            log.append("monitor", {"f": 1.0})
+            log.append("monitor", {"f": 2.0})
+        with open(self.path, "r+b") as file:
+            file.truncate(self.path.stat().st_size - 3)
+        with KnowledgeLog(self.path) as log:
+            log.append("monitor", {"f": 3.0})
+        with KnowledgeLogReader(self.path) as reader:
+            self.assertEqual(reader.column("f").tolist(), [1.0, 3.0])
+
+    def test_not_a_knowledge_log(self):
+        self.path.parent.mkdir(parents=True)
+        self.path.write_text("image,timestamp\n")
+        with self.assertRaises(ValueError):
+            KnowledgeLogReader(self.path)
+        with self.assertRaises(ValueError):
+            KnowledgeLog(self.path)
+        self.assertEqual(self.path.read_text(), "image,timestamp\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,184 @@
+import unittest
+
+from UPISAS.mapek_loop import MAPEKLoop, PipelinedMAPEKLoop, AdaptivePollingPolicy
+from UPISAS.strategies.PredictiveSwitchStrategy import SwitchStrategy
+from UPISAS.strategies.demo_strategy import DemoStrategy
+from UPISAS.tests.upisas.fake_exemplar import FakeExemplar
+
+
+class FakeClock:
+    """ A monotonic clock that only moves when sleeping or when work is simulated."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+class SlowDemoStrategy(DemoStrategy):
+    """ DemoStrategy whose analysis takes `durations[i]` seconds of fake time at iteration i."""
+
+    def __init__(self, exemplar, clock, durations):
+        super().__init__(exemplar)
+        self.clock = clock
+        self.durations = list(durations)
+
+    def analyze(self):
+        self.clock.now += self.durations.pop(0) if self.durations else 0
+        return super().analyze()
+
+
+class TestMAPEKLoop(unittest.TestCase):
+    """
+    Test cases for the fixed-rate MAPE-K loop driver.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0])
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def _loop(self, durations, **kwargs):
+        strategy = SlowDemoStrategy(self.exemplar, self.clock, durations)
+        return MAPEKLoop(strategy, clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_period_is_kept_without_drift(self):
+        loop = self._loop([0.3, 0.2, 0.4], period=1.0, max_iterations=3)
+        self.assertEqual(loop.run(), 3)
+        self.assertEqual(self.clock.sleeps, [0.7, 0.8])
+        self.assertEqual(loop.overruns, 0)
+        self.assertEqual(len(self.exemplar.executed), 3)
+
+    def test_overrun_skips_missed_periods(self):
+        loop = self._loop([2.5, 0.1, 0.1], period=1.0, max_iterations=3)
+        loop.run()
+        self.assertEqual(loop.overruns, 1)
+        self.assertEqual(loop.skipped_periods, 1)
+        self.assertEqual(self.clock.sleeps, [0.0, 0.4])
+
+    def test_stop_condition_and_no_execute(self):
+        stop = lambda strategy: len(strategy.knowledge.monitored_data["f"]) == 2
+        loop = self._loop([], period=1.0, stop_condition=stop, execute=False)
+        self.assertEqual(loop.run(), 2)
+        self.assertEqual(self.exemplar.executed, [])
+
+    def test_max_duration(self):
+        loop = self._loop([], period=3.0, max_duration=10)
+        self.assertEqual(loop.run(), 4)
+
+
+class TestSwitchMonitoring(unittest.TestCase):
+    """
+    Test cases for the requests a SWITCH strategy makes per MAPE-K iteration.
+    """
+
+    SAMPLE = {"input_rate": 5, "cpu": 50.0, "confidence": 0.7, "image_processing_time": 0.5,
+              "model_processing_time": 0.4, "model": "yolov5s", "utility": 0.6}
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[self.SAMPLE])
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def test_one_monitor_request_per_iteration(self):
+        strategy = SwitchStrategy(self.exemplar, background_tuning=False)
+        loop = MAPEKLoop(strategy, period=0, execute=False, monitor_kwargs={"with_validation": False})
+        for iteration in range(1, 4):
+            loop.iterate()
+            self.assertEqual(self.exemplar.requests, {"/monitor": iteration})
+        self.assertEqual(strategy.knowledge.analysis_data["model"], "yolov5s")
+
+
+class TestAdaptivePollingPolicy(unittest.TestCase):
+    """
+    Test cases for the volatility-driven polling interval.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0, 1.0, 1.0, 5.0, 5.0, 0.95])
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def test_period_follows_volatility_and_thresholds(self):
+        policy = AdaptivePollingPolicy(["f"], min_period=0.5, max_period=2, initial_period=1, thresholds={"f": lambda: (1.0,)})
+        strategy = DemoStrategy(self.exemplar)
+        loop = MAPEKLoop(strategy, execute=False, max_iterations=6, polling_policy=policy,
+                         clock=self.clock, sleep=self.clock.sleep)
+        loop.run()
+        # chosen after the samples: near threshold (x3), jump, flat
+        self.assertEqual(policy.intervals, [0.5, 0.5, 0.5, 0.5, 0.625])
+        self.assertEqual(self.clock.sleeps, policy.intervals)
+
+    def test_flat_metrics_lengthen_period_up_to_max(self):
+        policy = AdaptivePollingPolicy(["f"], min_period=0.5, max_period=2, initial_period=1.6)
+        strategy = DemoStrategy(self.exemplar)
+        strategy._store_monitored_data({"f": 1.0}, with_validation=False)
+        self.assertEqual([policy.next_period(strategy) for _ in range(2)], [2, 2])
+
+    def test_invalid_periods(self):
+        with self.assertRaises(ValueError):
+            AdaptivePollingPolicy(["f"], min_period=2, max_period=1)
+
+
+class TestPipelinedMAPEKLoop(unittest.TestCase):
+    """
+    Test cases for the MAPE-K loop driver prefetching the next sample.
+    """
+
+    def setUp(self):
+        self.exemplar = FakeExemplar(monitor_values=[1.0, 2.0, 3.0, 4.0, 5.0])
+        self.strategy = DemoStrategy(self.exemplar)
+
+    def tearDown(self):
+        self.exemplar.stop()
+
+    def test_prefetched_samples_are_stored_in_order(self):
+        loop = PipelinedMAPEKLoop(self.strategy, execute=False, max_iterations=3)
+        self.assertEqual(loop.run(), 3)
+        self.assertEqual(self.strategy.knowledge.monitored_data["f"], [1.0, 2.0, 3.0])
+        self.assertEqual(loop.prefetched, 2)
+        self.assertEqual(self.exemplar.requests["/monitor"], 3)
+
+    def test_prefetched_sample_is_dropped_after_execute(self):
+        loop = PipelinedMAPEKLoop(self.strategy, max_iterations=2)
+        loop.run()
+        self.assertEqual(loop.discarded, 1)
+        self.assertEqual(self.strategy.knowledge.monitored_data["f"], [1.0, 3.0])
+
+    def test_stale_prefetched_sample_is_dropped(self):
+        loop = PipelinedMAPEKLoop(self.strategy, execute=False, max_iterations=2, max_staleness=0)
+        loop.run()
+        self.assertEqual(loop.discarded, 1)
+        self.assertEqual(len(self.strategy.knowledge.monitored_data["f"]), 2)
+
+    def test_prefetch_is_sent_close_to_the_next_deadline(self):
+        clock = FakeClock()
+        loop = PipelinedMAPEKLoop(self.strategy, period=1.0, execute=False, max_iterations=3, clock=clock,
+                                  sleep=clock.sleep)
+        loop.run()
+        # The loop sleeps until the deadline minus the fetch latency, sends the request, then sleeps the rest
+        self.assertEqual(clock.sleeps, [1.0, 0.0, 1.0, 0.0])
+        self.assertEqual(loop.prefetched, 2)
+        self.assertEqual(self.strategy.knowledge.monitored_data["f"], [1.0, 2.0, 3.0])
+
+    def test_stop_condition_leaves_no_request_in_flight(self):
+        loop = PipelinedMAPEKLoop(self.strategy, execute=False,
+                                  stop_condition=lambda strategy: len(strategy.knowledge.monitored_data["f"]) == 2)
+        self.assertEqual(loop.run(), 2)
+        self.assertIsNone(loop._prefetch)
+        self.assertIn(self.exemplar.requests["/monitor"], (2, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
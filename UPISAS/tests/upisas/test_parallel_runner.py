@@ -0,0 +1,143 @@
+import unittest
+import csv
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from UPISAS.parallel_runner import ParallelRunExecutor, parallel_slots, run_table_from_factors
+
+
+class FakeInstance:
+    """ Fleet instance recording warm-pool use, resets and CPU pinning."""
+
+    def __init__(self):
+        self.warm_pool = False
+        self.reset_options = None
+        self.resets = 0
+        self.cpusets = []
+        self.fail_reset = False
+
+    def enable_warm_pool(self, reset_hook=None, snapshot_paths=None):
+        self.warm_pool = True
+        self.reset_options = (reset_hook, snapshot_paths)
+
+    def reset(self):
+        self.resets += 1
+        if self.fail_reset:
+            raise RuntimeError("cannot recreate container")
+
+    def apply_resources(self, resources):
+        self.cpusets.append(resources.cpuset_cpus)
+
+
+class SleepingConfig:
+    """ RunnerConfig whose runs take 0.2 seconds and fail when rt_threshold is negative."""
+    time_between_runs_in_ms = 0
+    active = 0
+    max_active = 0
+    lock = threading.Lock()
+
+    def before_run(self):
+        self.hooks = ["before_run"]
+
+    def start_run(self, context):
+        with self.lock:
+            SleepingConfig.active += 1
+            SleepingConfig.max_active = max(SleepingConfig.max_active, SleepingConfig.active)
+        if context.run_variation["rt_threshold"] < 0:
+            with self.lock:
+                SleepingConfig.active -= 1
+            raise ValueError("negative threshold")
+
+    def interact(self, context):
+        time.sleep(0.2)
+        (context.run_dir / "knowledge.log").write_text(str(context.run_variation["rt_threshold"]))
+
+    def stop_run(self, context):
+        with self.lock:
+            SleepingConfig.active -= 1
+
+    def populate_run_data(self, context):
+        return {"utility": context.run_variation["rt_threshold"] * 2, "exemplar": id(self.exemplar)}
+
+
+class TestParallelRunExecutor(unittest.TestCase):
+    """
+    Test cases for executing run table rows concurrently on a fleet of exemplars.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results_dir = Path(self.directory.name) / "sweep"
+        SleepingConfig.active = SleepingConfig.max_active = 0
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_run_table_from_factors(self):
+        rows = run_table_from_factors({"rt_threshold": [0.75, 0.5], "servers": [1]}, repetitions=2)
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[1], {"__run_id": "run_0_repetition_1", "rt_threshold": 0.75, "servers": 1})
+
+    def test_runs_are_parallel_and_isolated(self):
+        fleet = [FakeInstance() for _ in range(3)]
+        executor = ParallelRunExecutor(SleepingConfig, fleet, self.results_dir)
+        started = time.monotonic()
+        results = executor.run(run_table_from_factors({"rt_threshold": [0.75, 0.5, 0.25]}))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(SleepingConfig.max_active, 3)
+        self.assertEqual([row["utility"] for row in results.values()], [1.5, 1.0, 0.5])
+        self.assertEqual(len({row["exemplar"] for row in results.values()}), 3)
+        self.assertTrue(all(instance.warm_pool for instance in fleet))
+        self.assertEqual((self.results_dir / "run_1_repetition_0" / "knowledge.log").read_text(), "0.5")
+        with open(self.results_dir / "run_table.csv") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row["__done"] for row in rows], ["DONE"] * 3)
+
+    def test_reset_options_reach_the_warm_pool(self):
+        fleet = [FakeInstance() for _ in range(2)]
+        hook = lambda exemplar: None
+        executor = ParallelRunExecutor(SleepingConfig, fleet, self.results_dir, reset_hook=hook,
+                                       snapshot_paths=["/data"])
+        executor.run(run_table_from_factors({"rt_threshold": [0.5]}))
+        self.assertEqual([instance.reset_options for instance in fleet], [(hook, ["/data"])] * 2)
+
+    def test_cpu_budget_limits_and_pins_runs(self):
+        fleet = [FakeInstance() for _ in range(4)]
+        executor = ParallelRunExecutor(SleepingConfig, fleet, self.results_dir, cpu_budget=4, cpus_per_run=2,
+                                       cores=range(8))
+        self.assertEqual(executor.slots, 2)
+        executor.run(run_table_from_factors({"rt_threshold": [0.1, 0.2, 0.3, 0.4]}))
+        self.assertEqual(SleepingConfig.max_active, 2)
+        self.assertEqual([instance.cpusets for instance in fleet], [["0-1"], ["2-3"], [], []])
+
+    def test_slots_use_the_available_cores(self):
+        executor = ParallelRunExecutor(SleepingConfig, [FakeInstance() for _ in range(4)], self.results_dir,
+                                       cpus_per_run=2, cores=[2, 3, 5, 6, 7])
+        self.assertEqual(executor.slots, 2)
+        self.assertEqual([executor.cpuset(0), executor.cpuset(1)], ["2-3", "5-6"])
+        self.assertEqual(parallel_slots(10, cpus_per_run=2, cores=[2, 3, 5, 6, 7]), 2)
+        self.assertEqual(parallel_slots(10, cpu_budget=16, cpus_per_run=4, cores=range(8)), 2)
+        self.assertEqual(parallel_slots(1, cpus_per_run=2, cores=range(8)), 1)
+        self.assertEqual(parallel_slots(3), 3)
+
+    def test_failed_run_resets_its_instance(self):
+        fleet = [FakeInstance()]
+        executor = ParallelRunExecutor(SleepingConfig, fleet, self.results_dir)
+        results = executor.run([{"rt_threshold": -1}, {"rt_threshold": 1}])
+        self.assertEqual([row["__done"] for row in results.values()], ["FAILED", "DONE"])
+        self.assertEqual(list(results), ["run_0", "run_1"])
+        self.assertEqual(fleet[0].resets, 1)
+
+    def test_failed_reset_keeps_the_slot_running(self):
+        fleet = [FakeInstance()]
+        fleet[0].fail_reset = True
+        executor = ParallelRunExecutor(SleepingConfig, fleet, self.results_dir)
+        with self.assertLogs(level="ERROR"):
+            results = executor.run([{"rt_threshold": -1}, {"rt_threshold": 1}])
+        self.assertEqual([row["__done"] for row in results.values()], ["FAILED", "DONE"])
+
+
+if __name__ == '__main__':
+    unittest.main()
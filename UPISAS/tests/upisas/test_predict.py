@@ -0,0 +1,35 @@
+import unittest
+import random
+
+import numpy as np
+
+from UPISAS.strategies.helpers.predict import TrendForecaster, predict_future_metrics, PREDICTED_METRICS
+
+
+def metric_history(length, seed=42):
+    generator = random.Random(seed)
+    return [{"cpu": generator.uniform(0, 100), "confidence": generator.random(),
+             "image_processing_time": generator.uniform(0, 3), "model_processing_time": generator.uniform(0, 3),
+             "utility": generator.random()} for _ in range(length)]
+
+
+class TestTrendForecaster(unittest.TestCase):
+    """
+    Test cases for the streaming linear trend predictor.
+    """
+
+    def test_matches_least_squares_fit(self):
+        history = metric_history(20)
+        predicted = predict_future_metrics(history, horizon=10)
+        for metric in PREDICTED_METRICS:
+            slope, intercept = np.polyfit(range(20), [record[metric] for record in history], 1)
+            self.assertAlmostEqual(predicted[metric], intercept + slope * 29)
+
+    def test_single_sample_predicts_it(self):
+        forecaster = TrendForecaster(["cpu"])
+        forecaster.update({"cpu": 42.0})
+        self.assertEqual(forecaster.predict(10), {"cpu": 42.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from UPISAS import create_session
+from UPISAS.exemplar import Exemplar
+from UPISAS.exceptions import ExemplarNotReady
+
+
+class LocalExemplar(Exemplar):
+    """ Exemplar without docker: its HTTP server answers 503 to the first `unavailable` requests, then 200."""
+
+    def __init__(self, unavailable, health=None):
+        self.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler(unavailable))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_endpoint = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.session = create_session()
+        state = {"Health": {"Status": health}} if health else {}
+        self.exemplar_container = SimpleNamespace(status="running", attrs={"State": state}, reload=lambda: None)
+
+    def _handler(self, unavailable):
+        exemplar = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                exemplar.requests += 1
+                self.send_response(503 if exemplar.requests <= unavailable else 200)
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start_run(self):
+        pass
+
+    def stop(self):
+        self.session.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestReadiness(unittest.TestCase):
+    """
+    Test cases for the readiness probes of an Exemplar.
+    """
+
+    def test_waits_until_endpoint_answers(self):
+        exemplar = LocalExemplar(unavailable=3)
+        try:
+            exemplar.wait_until_ready("monitor", timeout=5, initial_delay=0.01)
+            self.assertEqual(exemplar.requests, 4)
+        finally:
+            exemplar.stop()
+
+    def test_timeout(self):
+        exemplar = LocalExemplar(unavailable=1000)
+        try:
+            with self.assertRaises(ExemplarNotReady):
+                exemplar.wait_until_ready(timeout=0.2, initial_delay=0.01, max_delay=0.05)
+        finally:
+            exemplar.stop()
+
+    def test_container_health_check(self):
+        exemplar = LocalExemplar(unavailable=0, health="starting")
+        try:
+            self.assertFalse(exemplar.container_is_ready())
+            with self.assertRaises(ExemplarNotReady):
+                exemplar.wait_until_ready(timeout=0.1, initial_delay=0.01)
+            self.assertEqual(exemplar.requests, 0)
+            exemplar.exemplar_container.attrs["State"]["Health"]["Status"] = "healthy"
+            exemplar.wait_until_ready(timeout=1)
+        finally:
+            exemplar.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+import tempfile
+import json
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+from UPISAS.ring_buffer import RingBuffer, RingBufferStore
+from UPISAS.strategies.empty_strategy import EmptyStrategy
+
+
+class TestRingBuffer(unittest.TestCase):
+    """
+    Test cases for the RingBuffer backend of Knowledge.monitored_data.
+    """
+
+    def test_keeps_last_values_in_order(self):
+        buffer = RingBuffer(3)
+        for value in range(5):
+            buffer.append(value)
+        self.assertEqual(buffer.tolist(), [2, 3, 4])
+        self.assertEqual(buffer[-1], 4)
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.evicted, 2)
+        self.assertEqual(buffer.dtype, np.int64)
+
+    def test_last_is_a_view_without_copy(self):
+        buffer = RingBuffer(4, dtype=np.float64)
+        for value in range(7):
+            buffer.append(float(value))
+        window = buffer.last(3)
+        self.assertEqual(window.tolist(), [4.0, 5.0, 6.0])
+        self.assertTrue(np.shares_memory(window, buffer._data))
+        self.assertFalse(window.flags.writeable)
+
+    def test_dtype_is_widened(self):
+        buffer = RingBuffer(3)
+        buffer.append(1)
+        buffer.append(2.5)
+        self.assertEqual(buffer.dtype, np.float64)
+        buffer.append("yolov5n")
+        self.assertEqual(buffer.tolist(), [1.0, 2.5, "yolov5n"])
+
+    def test_spill_evicted_values(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = RingBufferStore(2, spill_dir=directory)
+            store["model"] = ["yolov5n", "yolov5s", "yolov5m"]
+            store.close()
+            lines = (Path(directory) / "model.jsonl").read_text().splitlines()
+            self.assertEqual([json.loads(line) for line in lines], ["yolov5n"])
+            self.assertEqual(store["model"].tolist(), ["yolov5s", "yolov5m"])
+
+    def test_strategy_uses_ring_buffers(self):
+        strategy = EmptyStrategy(SimpleNamespace(base_endpoint="http://localhost:3000", session=None))
+        strategy._store_monitored_data({"f": 1.0}, with_validation=False)
+        strategy.use_ring_buffers(2)
+        for value in [2.0, 3.0]:
+            strategy._store_monitored_data({"f": value}, with_validation=False)
+        self.assertEqual(strategy.knowledge.monitored_data["f"].tolist(), [2.0, 3.0])
+        self.assertEqual(strategy.get_latest_monitored_data(), {"f": 3.0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from UPISAS.aggregates import RunningMean
+from UPISAS.strategies.empty_strategy import EmptyStrategy
+
+
+class LearningStrategy(EmptyStrategy):
+
+    def __init__(self, exemplar):
+        super().__init__(exemplar)
+        self.thresholds = {"cpu_utilization_upper": 80}
+
+    def get_state(self):
+        return {"thresholds": self.thresholds}
+
+    def set_state(self, state):
+        self.thresholds = state["thresholds"]
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test cases for saving and restoring Knowledge and learned strategy state.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = Path(self.directory.name) / "snapshot.pkl.gz"
+        self.exemplar = SimpleNamespace(base_endpoint="http://localhost:3000", session=None)
+        strategy = LearningStrategy(self.exemplar)
+        strategy.use_ring_buffers(10)
+        for value in [1.0, 2.0]:
+            strategy._store_monitored_data({"cpu": value}, with_validation=False)
+        strategy.knowledge.monitor_schema = {"type": "object", "properties": {"cpu": {"type": "number"}}}
+        strategy.thresholds = {"cpu_utilization_upper": 90}
+        strategy.save_snapshot(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_restore_knowledge_and_state(self):
+        strategy = LearningStrategy(self.exemplar)
+        strategy.restore_snapshot(self.path)
+        self.assertEqual(strategy.knowledge.monitored_data, {"cpu": [1.0, 2.0]})
+        self.assertIn("properties", strategy.knowledge.monitor_schema)
+        self.assertEqual(strategy.thresholds, {"cpu_utilization_upper": 90})
+
+    def test_restore_keeps_monitored_data_backend(self):
+        strategy = LearningStrategy(self.exemplar)
+        store = strategy.use_ring_buffers(1)
+        strategy.restore_snapshot(self.path)
+        self.assertIs(strategy.knowledge.monitored_data, store)
+        self.assertEqual(store["cpu"].tolist(), [2.0])
+
+    def test_restore_learned_state_only(self):
+        strategy = LearningStrategy(self.exemplar)
+        strategy.restore_snapshot(self.path, knowledge=False)
+        self.assertEqual(strategy.knowledge.monitored_data, dict())
+        self.assertEqual(strategy.thresholds, {"cpu_utilization_upper": 90})
+
+    def test_run_specific_knowledge_is_not_carried(self):
+        strategy = LearningStrategy(self.exemplar)
+        strategy.subscribe_aggregate("cpu", "mean", RunningMean())
+        strategy._store_monitored_data({"cpu": 4.0}, with_validation=False)
+        strategy.knowledge.telemetry_data["cpu_percent"] = [50.0]
+        strategy.save_snapshot(self.path)
+        restored = LearningStrategy(self.exemplar)
+        restored.restore_snapshot(self.path)
+        self.assertEqual(restored.knowledge.monitored_data, {"cpu": [4.0]})
+        self.assertEqual((restored.knowledge.aggregates, restored.knowledge.telemetry_data), ({}, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from UPISAS.knowledge_log import KnowledgeLogReader
+from UPISAS.strategies.empty_strategy import EmptyStrategy
+from UPISAS.telemetry import TELEMETRY_KEYS, ContainerTelemetry, TelemetryStore, parse_stats
+from UPISAS.tests.upisas.fake_exemplar import FakeContainer, WarmExemplar
+
+
+def docker_stats(total_usage, system_usage, rx_bytes=0):
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": total_usage}, "system_cpu_usage": system_usage, "online_cpus": 4},
+        "precpu_stats": {"cpu_usage": {"total_usage": 0}, "system_cpu_usage": 0},
+        "memory_stats": {"usage": 300, "limit": 1000, "stats": {"inactive_file": 100}},
+        "networks": {"eth0": {"rx_bytes": rx_bytes, "tx_bytes": 5}, "eth1": {"rx_bytes": 1, "tx_bytes": 1}},
+        "blkio_stats": {"io_service_bytes_recursive": [{"op": "Read", "value": 7}, {"op": "Write", "value": 9},
+                                                       {"op": "read", "value": 1}]},
+    }
+
+
+class StatsContainer(FakeContainer):
+    """ FakeContainer streaming the given docker stats samples."""
+
+    def __init__(self, samples):
+        super().__init__()
+        self.samples = samples
+
+    def stats(self, stream, decode):
+        return iter(self.samples)
+
+
+class TestTelemetry(unittest.TestCase):
+    """
+    Test cases for streaming container resource usage into Knowledge.
+    """
+
+    def setUp(self):
+        self.strategy = EmptyStrategy(SimpleNamespace(base_endpoint="http://localhost:3000", session=None))
+
+    def test_parse_stats(self):
+        sample = parse_stats(docker_stats(total_usage=50, system_usage=100, rx_bytes=10))
+        self.assertEqual(sample["cpu_percent"], 200.0)
+        self.assertEqual(sample["memory_usage"], 200)
+        self.assertEqual(sample["memory_percent"], 20.0)
+        self.assertEqual((sample["network_rx_bytes"], sample["network_tx_bytes"]), (11, 6))
+        self.assertEqual((sample["block_read_bytes"], sample["block_write_bytes"]), (8, 9))
+        self.assertEqual(parse_stats({})["cpu_percent"], 0.0)
+
+    def test_samples_are_streamed_into_knowledge_and_log(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "knowledge.log"
+            self.strategy.attach_knowledge_log(path)
+            exemplar = WarmExemplar(StatsContainer([docker_stats(i, 100) for i in range(1, 4)]))
+            telemetry = exemplar.start_telemetry(self.strategy.knowledge, interval=0,
+                                                 on_sample=self.strategy.log_telemetry)
+            telemetry._thread.join(2)
+            exemplar.stop_telemetry()
+            self.strategy.close_knowledge_log()
+            self.assertEqual(self.strategy.knowledge.telemetry_data["cpu_percent"].tolist(), [4.0, 8.0, 12.0])
+            self.assertEqual(self.strategy.get_latest_telemetry()["cpu_percent"], 12.0)
+            with KnowledgeLogReader(path) as reader:
+                self.assertEqual(reader.column("cpu_percent", kind="telemetry").tolist(), [4.0, 8.0, 12.0])
+
+    def test_interval_drops_samples(self):
+        telemetry = ContainerTelemetry(StatsContainer([docker_stats(i, 100) for i in range(1, 4)]),
+                                       self.strategy.knowledge, interval=60).start()
+        telemetry._thread.join(2)
+        self.assertFalse(telemetry.running)
+        self.assertEqual(telemetry.samples, 1)
+        self.assertEqual(len(self.strategy.knowledge.telemetry_data["memory_usage"]), 1)
+
+    def test_store_is_bounded_and_reads_whole_samples(self):
+        store = TelemetryStore(capacity=2)
+        self.assertEqual(store.latest(), {})
+        for i in range(1, 4):
+            store.append(dict(parse_stats(docker_stats(i, 100)), timestamp=float(i)))
+        self.assertEqual(store["cpu_percent"].tolist(), [8.0, 12.0])
+        latest = store.latest()
+        self.assertEqual(set(latest), set(TELEMETRY_KEYS))
+        self.assertEqual((latest["cpu_percent"], latest["timestamp"]), (12.0, 3.0))
+        self.assertEqual(self.strategy.get_latest_telemetry(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
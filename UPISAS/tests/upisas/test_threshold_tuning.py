@@ -0,0 +1,212 @@
+import unittest
+import random
+from contextlib import nullcontext
+import tempfile
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import optuna
+from optuna.samplers import RandomSampler
+
+from UPISAS.strategies.helpers.threshold_tuning import MetricHistory, ThresholdTuner, evaluate_thresholds, \
+    open_threshold_study, tune_thresholds, THRESHOLD_BOUNDS, THRESHOLD_DISTRIBUTIONS
+from UPISAS.strategies.PredictiveSwitchStrategy import SwitchStrategy
+from UPISAS.tests.upisas.test_predict import metric_history
+
+
+class Gate:
+    """ Instrumentation holding every tuning of a ThresholdTuner until opened."""
+
+    def __init__(self):
+        self.entered = threading.Event()
+        self.opened = threading.Event()
+
+    def timer(self, name):
+        self.entered.set()
+        self.opened.wait(10)
+        return nullcontext()
+
+
+def loop_utility(records, cpu_upper, cpu_lower, confidence_lower, processing_time_upper):
+    total_utility = 0
+    for record in records:
+        if (cpu_lower <= record["cpu"] <= cpu_upper and record["confidence"] >= confidence_lower and
+                record["image_processing_time"] <= processing_time_upper):
+            total_utility += record["utility"] * (record["confidence"] ** 2)
+    return total_utility / len(records)
+
+
+class TestThresholdTuning(unittest.TestCase):
+    """
+    Test cases for the NumPy metric history and the batch evaluation of threshold candidates.
+    """
+
+    def setUp(self):
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        self.records = metric_history(300)
+        self.history = MetricHistory.from_records(self.records)
+
+    def test_history_grows_and_reads_back_records(self):
+        history = MetricHistory(capacity=2)
+        for record in self.records[:5]:
+            history.append(record)
+        self.assertEqual(len(history), 5)
+        self.assertEqual(history.array.shape, (5, 5))
+        self.assertEqual(history[-1], self.records[4])
+        self.assertEqual(list(history), self.records[:5])
+
+    def test_batch_matches_per_record_loop(self):
+        generator = random.Random(7)
+        candidates = [[generator.uniform(low, high) for low, high in THRESHOLD_BOUNDS.values()] for _ in range(50)]
+        expected = [loop_utility(self.records, *candidate) for candidate in candidates]
+        for chunk_size in (4_000_000, 1000):
+            utilities = evaluate_thresholds(self.history, candidates, chunk_size=chunk_size)
+            for utility, reference in zip(utilities.tolist(), expected):
+                self.assertAlmostEqual(utility, reference)
+        self.assertEqual(evaluate_thresholds(MetricHistory(), candidates[:2]).tolist(), [0.0, 0.0])
+
+    def test_utility_does_not_grow_with_the_history(self):
+        candidates = [[95, 10, 0.3, 5], [80, 20, 0.5, 2]]
+        repeated = MetricHistory.from_records(self.records * 10)
+        np.testing.assert_allclose(evaluate_thresholds(repeated, candidates),
+                                   evaluate_thresholds(self.history, candidates))
+
+    def test_tune_thresholds_keeps_best_candidates(self):
+        study = optuna.create_study(direction="maximize", sampler=RandomSampler(seed=1))
+        best = tune_thresholds(study, self.history, 100, n_trials=5, rng=np.random.default_rng(1))
+        self.assertEqual(len(study.trials), 10)
+        self.assertTrue(all(trial.state == optuna.trial.TrialState.COMPLETE for trial in study.trials))
+        self.assertEqual(set(best), set(THRESHOLD_BOUNDS))
+        self.assertAlmostEqual(study.best_value, loop_utility(self.records, *best.values()))
+
+    def test_strategy_objective_and_state(self):
+        strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+        strategy.set_state({"count": 0, "metric_history": self.records, "thresholds": strategy.thresholds,
+                            "trials": []})
+        strategy.study.optimize(strategy.optimize_tresholds, n_trials=3)
+        trial = strategy.study.trials[0]
+        self.assertAlmostEqual(trial.value, loop_utility(self.records, *[trial.params[name]
+                                                                        for name in THRESHOLD_BOUNDS]))
+        self.assertEqual(strategy.get_state()["metric_history"], self.records)
+
+    def test_snapshot_is_isolated_from_appends(self):
+        snapshot = self.history.snapshot()
+        self.history.append(self.records[0])
+        snapshot.append(self.records[1])
+        self.assertEqual((len(self.history), len(snapshot)), (301, 301))
+        self.assertEqual((self.history[-1], snapshot[-1]), (self.records[0], self.records[1]))
+
+    def test_tuner_publishes_in_background(self):
+        study = optuna.create_study(direction="maximize", sampler=RandomSampler(seed=1))
+        gate = Gate()
+        tuner = ThresholdTuner(study, n_candidates=200, instrumentation=gate)
+        tuner.submit(self.history.snapshot())
+        self.assertTrue(gate.entered.wait(10))
+        # submit() returns while the tuner is busy; the last two snapshots coalesce into one tuning
+        for _ in range(2):
+            tuner.submit(self.history.snapshot())
+        self.assertFalse(tuner.wait(0))
+        gate.opened.set()
+        self.assertTrue(tuner.wait(10))
+        version, thresholds = tuner.published
+        self.assertEqual(version, 2)
+        self.assertEqual(len(study.trials), 10 * version)
+        self.assertEqual(thresholds, study.best_params)
+        tuner.stop(2)
+        self.assertFalse(tuner.running)
+
+    def test_submit_after_stop_resumes_tuning(self):
+        study = optuna.create_study(direction="maximize", sampler=RandomSampler(seed=1))
+        gate = Gate()
+        tuner = ThresholdTuner(study, n_candidates=200, instrumentation=gate)
+        tuner.submit(self.history.snapshot())
+        self.assertTrue(gate.entered.wait(10))
+        tuner.stop(timeout=0)
+        self.assertTrue(tuner.running)
+        tuner.submit(self.history.snapshot())
+        gate.opened.set()
+        self.assertTrue(tuner.wait(10))
+        self.assertEqual(tuner.published[0], 2)
+        tuner.stop(2)
+        self.assertFalse(tuner.running)
+        tuner.submit(self.history.snapshot())
+        self.assertTrue(tuner.wait(10))
+        self.assertEqual(tuner.published[0], 3)
+        tuner.stop(2)
+
+    def test_strategy_picks_up_published_thresholds(self):
+        strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+        record = dict(self.records[0], input_rate=5, model="yolov5s")
+        strategy.knowledge.monitored_data = {key: [value] for key, value in record.items()}
+        initial = strategy.thresholds
+        for _ in range(10):
+            strategy.analyze()
+        self.assertIs(strategy.thresholds, initial)
+        self.assertTrue(strategy.tuner.wait(10))
+        strategy.analyze()
+        self.assertEqual(strategy.thresholds_version, 1)
+        self.assertEqual(strategy.thresholds, strategy.study.best_params)
+        strategy.stop_tuning()
+
+    def test_persistent_study_resumes_per_workload(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Path(directory) / "studies.journal"
+            study = open_threshold_study(journal, "Set1", n_startup_trials=10)
+            tune_thresholds(study, self.history, 50)
+            tune_thresholds(study, self.history, 50)  # TPE once 10 trials are complete
+            resumed = open_threshold_study(journal, "Set1")
+            self.assertEqual(len(resumed.trials), 20)
+            self.assertEqual(resumed.best_params, study.best_params)
+            self.assertEqual(len(open_threshold_study(journal, "Set2").trials), 0)
+
+            strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+            strategy.attach_study(journal, "Set1")
+            self.assertEqual(strategy.thresholds, study.best_params)
+            self.assertIs(strategy.tuner.study, strategy.study)
+
+    def test_snapshot_trials_seed_a_new_persistent_study(self):
+        strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+        tune_thresholds(strategy.study, self.history, 20)
+        with tempfile.TemporaryDirectory() as directory:
+            study = strategy.attach_study(Path(directory) / "studies.journal", "Set1")
+            self.assertEqual(len(study.trials), 10)
+            strategy.set_state(strategy.get_state())
+            self.assertEqual(len(study.trials), 10)
+
+    def test_unfinished_trial_is_not_resumed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Path(directory) / "studies.journal"
+            open_threshold_study(journal, "Set1").ask(THRESHOLD_DISTRIBUTIONS)
+            strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+            tune_thresholds(strategy.study, self.history, 20)
+            initial = strategy.thresholds
+            study = strategy.attach_study(journal, "Set1")
+            self.assertIs(strategy.thresholds, initial)
+            # Seeded from the snapshot trials, next to the unfinished one
+            self.assertEqual(len(study.get_trials(states=(optuna.trial.TrialState.COMPLETE,))), 10)
+            self.assertEqual(len(study.trials), 11)
+
+    def test_snapshot_of_another_workload_is_not_carried(self):
+        strategy = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+        with tempfile.TemporaryDirectory() as directory:
+            journal = Path(directory) / "studies.journal"
+            strategy.attach_study(journal, "Set1")
+            for record in self.records[:20]:
+                strategy.metric_history.append(record)
+            tune_thresholds(strategy.study, strategy.metric_history, 20)
+            state = strategy.get_state()
+            self.assertEqual(state["workload"], "Set1")
+
+            restored = SwitchStrategy(SimpleNamespace(base_endpoint="http://localhost:8000", session=None))
+            restored.set_state(state)
+            self.assertEqual(len(restored.attach_study(journal, "Set1").trials), 10)
+            self.assertEqual(len(restored.metric_history), 20)
+            restored.set_state(state)
+            self.assertEqual(len(restored.attach_study(journal, "Set2").trials), 0)
+            self.assertEqual(len(restored.metric_history), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+
+import jsonschema
+
+from UPISAS import validate_schema, compile_schema
+from UPISAS.exceptions import IncompleteJSONSchema
+
+
+class TestValidateSchema(unittest.TestCase):
+    """
+    Test cases for validate_schema and its compiled, cached validators.
+    """
+
+    def setUp(self):
+        self.schema = {"type": "object", "properties": {"f": {"type": "number"}}}
+
+    def test_validate_successfully(self):
+        with self.assertLogs() as cm:
+            validate_schema({"f": 1.0}, self.schema)
+            self.assertTrue("JSON object validated by JSON Schema" in ", ".join(cm.output))
+
+    def test_compiled_schema_is_reused_for_the_same_schema_object(self):
+        compiled = compile_schema(self.schema)
+        self.assertIs(compile_schema(self.schema, compiled), compiled)
+        self.assertIsNot(compile_schema(dict(self.schema), compiled), compiled)
+        validate_schema({"f": 1.0}, self.schema, compiled)
+        self.assertTrue(compiled.checked)
+
+    def test_keys_misaligned(self):
+        with self.assertRaises(IncompleteJSONSchema):
+            validate_schema({"f": 1.0, "g": 2.0}, self.schema)
+
+    def test_no_complete_schema_present(self):
+        with self.assertRaises(IncompleteJSONSchema):
+            validate_schema({"f": 1.0}, {"type": "object"})
+
+    def test_json_schema_invalid(self):
+        schema = {"type": "strange_value", "properties": {"f": {"type": "number"}}}
+        with self.assertRaises(jsonschema.exceptions.SchemaError):
+            validate_schema({"f": 1.0}, schema)
+
+    def test_json_instance_not_conforming_to_schema(self):
+        compiled = compile_schema(self.schema)
+        for _ in range(2):
+            with self.assertRaises(jsonschema.exceptions.ValidationError):
+                validate_schema({"f": "one"}, self.schema, compiled)
+
+
+if __name__ == '__main__':
+    unittest.main()
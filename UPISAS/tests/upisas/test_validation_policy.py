@@ -0,0 +1,54 @@
+import unittest
+from types import SimpleNamespace
+
+import jsonschema
+
+from UPISAS.strategies.empty_strategy import EmptyStrategy
+from UPISAS.validation_policy import ValidationPolicy
+
+
+class TestValidationPolicy(unittest.TestCase):
+    """
+    Test cases for the validation modes applied by Strategy to monitored samples.
+    """
+
+    def setUp(self):
+        self.strategy = EmptyStrategy(SimpleNamespace(base_endpoint="http://localhost:3000", session=None))
+        self.strategy.knowledge.monitor_schema = {"type": "object", "properties": {"f": {"type": "number"}}}
+
+    def test_always_raises_and_counts_violations(self):
+        with self.assertRaises(jsonschema.exceptions.ValidationError):
+            self.strategy._store_monitored_data({"f": "one"})
+        self.assertEqual(self.strategy.validation_policy.violations["ValidationError"], 1)
+
+    def test_sampled_validates_first_samples_then_every_kth(self):
+        policy = ValidationPolicy(ValidationPolicy.SAMPLED, first=2, every=3)
+        decisions = [policy.should_validate() for _ in range(8)]
+        self.assertEqual(decisions, [True, True, False, False, True, False, False, True])
+
+    def test_sampled_skips_unsampled_violations(self):
+        self.strategy.validation_policy = ValidationPolicy(ValidationPolicy.SAMPLED, first=1, every=2)
+        self.strategy._store_monitored_data({"f": 1.0})
+        self.strategy._store_monitored_data({"f": "one"})
+        self.assertEqual(self.strategy.knowledge.monitored_data["f"], [1.0, "one"])
+        self.assertEqual(self.strategy.validation_policy.validated, 1)
+
+    def test_background_records_violations_without_raising(self):
+        policy = ValidationPolicy(ValidationPolicy.BACKGROUND)
+        self.strategy.validation_policy = policy
+        self.strategy._store_monitored_data({"f": 1.0})
+        self.strategy._store_monitored_data({"f": "one"})
+        self.strategy._store_monitored_data({"f": 2.0, "g": 3.0})
+        policy.wait()
+        self.assertEqual(policy.validated, 1)
+        self.assertEqual(policy.violations["ValidationError"], 1)
+        self.assertEqual(policy.violations["IncompleteJSONSchema"], 1)
+        policy.shutdown()
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            ValidationPolicy("sometimes")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+
+from UPISAS.tests.upisas.fake_exemplar import FakeContainer, WarmExemplar
+
+
+class TestWarmPool(unittest.TestCase):
+    """
+    Test cases for reusing a warm exemplar container across runs.
+    """
+
+    def test_release_without_warm_pool_removes_container(self):
+        container = FakeContainer()
+        exemplar = WarmExemplar(container)
+        exemplar.release()
+        self.assertEqual(container.calls, ["stop", "remove"])
+        self.assertIsNone(exemplar.exemplar_container)
+
+    def test_reset_hook(self):
+        container = FakeContainer()
+        exemplar = WarmExemplar(container)
+        resets = []
+        exemplar.enable_warm_pool(reset_hook=resets.append)
+        self.assertTrue(exemplar.release())
+        self.assertEqual(resets, [exemplar])
+        self.assertEqual(container.calls, [])
+        self.assertIs(exemplar.exemplar_container, container)
+
+    def test_filesystem_snapshot_is_restored(self):
+        container = FakeContainer()
+        exemplar = WarmExemplar(container)
+        exemplar.enable_warm_pool(snapshot_paths=["/app/data/"])
+        exemplar.release()
+        self.assertEqual(container.calls, ["rm -rf /app/data/", "restart"])
+        self.assertEqual(container.archives, {"/app": b"tar of /app/data/"})
+
+    def test_container_is_recreated_when_reset_fails(self):
+        container = FakeContainer(fail_restart=True)
+        exemplar = WarmExemplar(container)
+        exemplar.enable_warm_pool()
+        self.assertTrue(exemplar.release())
+        self.assertEqual(container.calls, ["restart", "remove"])
+        self.assertEqual(len(exemplar.created), 1)
+        self.assertIs(exemplar.exemplar_container, exemplar.created[0])
+        self.assertEqual(exemplar.exemplar_container.calls, ["start"])
+
+    def test_failed_restore_recreates_container(self):
+        container = FakeContainer(exec_exit_code=1)
+        exemplar = WarmExemplar(container)
+        exemplar.enable_warm_pool(snapshot_paths=["/app/data/"])
+        with self.assertLogs(level="WARNING") as logs:
+            exemplar.release()
+        self.assertIn("exited with 1", logs.output[0])
+        self.assertEqual(container.calls, ["rm -rf /app/data/", "remove"])
+        self.assertEqual(container.archives, {})
+        self.assertEqual(len(exemplar.created), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
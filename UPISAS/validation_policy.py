@@ -0,0 +1,76 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import jsonschema
+
+from UPISAS.exceptions import IncompleteJSONSchema
+
+VALIDATION_ERRORS = (IncompleteJSONSchema, jsonschema.exceptions.ValidationError, jsonschema.exceptions.SchemaError)
+
+
+class ValidationPolicy:
+    """
+    Decides which monitored samples Strategy.monitor validates against the monitor schema.
+      - "always": every sample is validated and violations are raised.
+      - "sampled": the first `first` samples are validated, then every `every`-th one; violations are raised.
+      - "background": every sample is validated on a worker thread; violations are recorded, not raised.
+    In every mode `violations` counts the violations found, by exception name.
+    """
+    ALWAYS = "always"
+    SAMPLED = "sampled"
+    BACKGROUND = "background"
+
+    def __init__(self, mode=ALWAYS, first=10, every=10):
+        if mode not in (self.ALWAYS, self.SAMPLED, self.BACKGROUND):
+            raise ValueError(f"Unknown validation mode '{mode}'")
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.mode = mode
+        self.first = first
+        self.every = every
+        self.samples = 0
+        self.validated = 0
+        self.violations = Counter()
+        self._executor = None
+
+    def should_validate(self):
+        '''Counts a new sample and tells whether it has to be validated'''
+        self.samples += 1
+        if self.mode == self.SAMPLED and self.samples > self.first:
+            return (self.samples - self.first) % self.every == 0
+        return True
+
+    def validate(self, validate, *args):
+        '''Runs `validate(*args)` as the mode prescribes, recording any violation'''
+        if self.mode == self.BACKGROUND:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schema-validation")
+            self._executor.submit(self._validate_in_background, validate, *args)
+            return
+        try:
+            validate(*args)
+            self.validated += 1
+        except VALIDATION_ERRORS as error:
+            self.record(error)
+            raise
+
+    def record(self, error):
+        self.violations[type(error).__name__] += 1
+
+    def wait(self):
+        '''Blocks until every sample submitted for background validation has been validated'''
+        if self._executor is not None:
+            self._executor.submit(lambda: None).result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _validate_in_background(self, validate, *args):
+        try:
+            validate(*args)
+            self.validated += 1
+        except VALIDATION_ERRORS as error:
+            # validate_schema already logged the details, the control loop carries on
+            self.record(error)
@@ -1,16 +1,16 @@
 from UPISAS.strategies.swim_reactive_strategy import ReactiveAdaptationManager
 from UPISAS.exemplar import Exemplar
 from UPISAS.exemplars.swim import SWIM
+from UPISAS.mapek_loop import MAPEKLoop
 import signal
 import sys
-import time
 
 if __name__ == '__main__':
     
     exemplar = SWIM(auto_start=True)
-    time.sleep(3)
+    exemplar.wait_until_ready(http_probe=False)
     exemplar.start_run()
-    time.sleep(3)
+    exemplar.wait_until_ready("monitor", ready_status=(200,))
 
     try:
         strategy = ReactiveAdaptationManager(exemplar)
@@ -19,13 +19,8 @@ if __name__ == '__main__':
         strategy.get_adaptation_options_schema()
         strategy.get_execute_schema()
 
-        while True:
-            input("Try to adapt?")
-            strategy.monitor(verbose=True)
-            if strategy.analyze():
-                if strategy.plan():
-                    strategy.execute()
-            
+        MAPEKLoop(strategy, period=3, monitor_kwargs={"verbose": True}).run()
+
     except (Exception, KeyboardInterrupt) as e:
         print(str(e))
         input("something went wrong")
@@ -0,0 +1,24 @@
+from os.path import dirname, realpath, join
+import sys
+
+# The runner configs import Experiment Runner, as when started through run.sh
+sys.path.append(join(dirname(realpath(__file__)), "experiment-runner", "experiment-runner"))
+
+from UPISAS.exemplar import Exemplar
+from UPISAS.exemplar_fleet import ExemplarFleet
+from UPISAS.exemplars.swim import SWIM
+from UPISAS.experiment_runner_configs.SWIM_example import RunnerConfig
+from UPISAS.parallel_runner import ParallelRunExecutor, parallel_slots
+
+if __name__ == '__main__':
+    # Sweep the rt_threshold factor of SWIM_example in parallel, on one SWIM instance per 2 cores available
+    run_table = RunnerConfig().create_run_table_model().generate_experiment_run_table()
+
+    with ExemplarFleet(SWIM, parallel_slots(len(run_table), cpus_per_run=2), auto_start=True) as fleet:
+        # SWIM keeps the state of its simulation across restarts: every run gets a new container of its slot
+        executor = ParallelRunExecutor(RunnerConfig, fleet, RunnerConfig.results_output_path / "parallel_sweep",
+                                       cpus_per_run=2, pin_process=True, reset_hook=Exemplar.recreate_container)
+        results = executor.run(run_table)
+
+    for run_id, run_data in results.items():
+        print(run_id, run_data["__done"], run_data.get("rt_threshold"))